@@ -0,0 +1,104 @@
+"""Fixtures for the offline benchmarks.
+
+Requires pytest-homeassistant-custom-component (see requirements.txt). Run
+from the repository root with: pytest benchmarks
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+try:
+    import pytest_homeassistant_custom_component  # noqa: F401
+except ImportError:
+    # Without Home Assistant there is nothing to benchmark
+    collect_ignore_glob = ["test_*.py"]
+else:
+    import custom_components
+
+    # The harness ships a custom_components package of its own, which shadows
+    # the one of this repository
+    if str(ROOT / "custom_components") not in list(custom_components.__path__):
+        custom_components.__path__.append(str(ROOT / "custom_components"))
+
+from helpers import RESULTS  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    yield
+
+
+@pytest.fixture
+async def fake_api(hass, monkeypatch, socket_enabled):
+    """Start the stand-in server and point the integration at it."""
+    from aiohttp.test_utils import TestServer
+    from fake_alpha_vantage import FakeAlphaVantage
+
+    from custom_components.alpha_vantage import api
+
+    fake = FakeAlphaVantage()
+    server = TestServer(fake.app)
+    await server.start_server()
+    monkeypatch.setattr(api, "API_URL", str(server.make_url("/query")))
+    yield fake
+    await server.close()
+
+
+@pytest.fixture
+async def setup_entries(hass):
+    """Return a helper that sets up config entries and unloads them afterwards."""
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    from custom_components.alpha_vantage.const import DOMAIN
+
+    entries = []
+
+    async def _setup(count, symbols, **options):
+        """Set up count entries with their own API key and watchlist."""
+        for index in range(count):
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={
+                    "api_key": f"bench-{index}",
+                    "symbols": ",".join(symbols[index]),
+                    "tier": "premium_1200",
+                    "scan_interval": 60,
+                    "market_hours": False,
+                    # Measured refreshes start from fetched data
+                    "fast_start": False,
+                    **options,
+                },
+            )
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            entries.append(entry)
+        await hass.async_block_till_done()
+        return [hass.data[DOMAIN][entry.entry_id] for entry in entries]
+
+    yield _setup
+
+    for entry in entries:
+        await hass.config_entries.async_unload(entry.entry_id)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the benchmark results as a table."""
+    if not RESULTS:
+        return
+    terminalreporter.section("Alpha Vantage refresh benchmarks")
+    terminalreporter.write_line(
+        f"{'benchmark':<36}{'wall ms':>10}{'requests':>10}{'written':>10}{'skipped':>10}{'peak KiB':>10}"
+    )
+    for row in RESULTS:
+        terminalreporter.write_line(
+            f"{row['name']:<36}{row['wall_time'] * 1000:>10.1f}{row['requests']:>10}"
+            f"{row['states_written']:>10}{row['states_skipped']:>10}{row['peak_memory'] / 1024:>10.0f}"
+        )
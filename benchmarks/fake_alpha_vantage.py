@@ -0,0 +1,190 @@
+"""A local stand-in for the Alpha Vantage query endpoint.
+
+Serves GLOBAL_QUOTE, REALTIME_BULK_QUOTES and TIME_SERIES_DAILY with
+generated prices that move on every request, and can simulate latency,
+rate limit notes, premium "Information" replies and error replies. Bulk
+quotes and daily bars are sent as CSV when asked for with datatype=csv;
+notes and errors are always JSON, as with the real API.
+"""
+from __future__ import annotations
+
+import asyncio
+import zlib
+from collections import Counter, deque
+from datetime import date, timedelta
+
+from aiohttp import web
+
+# Replies the real API sends with HTTP 200
+FAULTS = {
+    "note": {
+        "Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."
+    },
+    "information": {
+        "Information": "We have detected your API key and our standard API rate limit is 25 requests per day."
+    },
+    "premium": {
+        "Information": "Thank you for using Alpha Vantage! This is a premium endpoint."
+    },
+    "error": {"Error Message": "Invalid API call. Please retry or visit the documentation."},
+    "invalid_key": {
+        "Error Message": "Invalid API call. Please check the apikey parameter is invalid or missing."
+    },
+}
+
+COMPACT_BARS = 100
+FULL_BARS = 1000
+
+
+def _base_price(symbol: str) -> float:
+    """Return a stable starting price for a symbol."""
+    return 10 + zlib.crc32(symbol.encode()) % 990
+
+
+def _trading_days(count: int, until: date) -> list[date]:
+    """Return the last count weekdays up to and including until, oldest first."""
+    days = []
+    day = until
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def _csv_response(rows: list[dict]) -> web.Response:
+    """Return rows as a CSV body with a header line."""
+    lines = [",".join(rows[0]) if rows else ""]
+    lines.extend(",".join(row.values()) for row in rows)
+    return web.Response(text="\r\n".join(lines) + "\r\n", content_type="text/csv")
+
+
+class FakeAlphaVantage:
+    """An aiohttp application answering like the Alpha Vantage API."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bulk: bool = True,
+        full_history: bool = True,
+        moving: bool = True,
+        csv: bool = True,
+    ) -> None:
+        """Initialize the server state."""
+        self.latency = latency
+        self.csv = csv  # False answers datatype=csv queries with JSON
+        self.moving = moving
+        self.bulk = bulk
+        self.full_history = full_history
+        self.requests: Counter[str] = Counter()
+        self._faults: deque[str] = deque()
+        self._ticks: Counter[str] = Counter()
+        self.app = web.Application()
+        self.app.router.add_get("/query", self._handle)
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of requests served so far."""
+        return sum(self.requests.values())
+
+    def fail_next(self, kind: str, count: int = 1) -> None:
+        """Answer the next count requests with a fault reply.
+
+        kind is one of FAULTS or "http_500".
+        """
+        self._faults.extend([kind] * count)
+
+    def _price(self, symbol: str) -> float:
+        """Return the next price of a symbol, moving a little on every call."""
+        if self.moving:
+            self._ticks[symbol] += 1
+        tick = self._ticks[symbol]
+        return round(_base_price(symbol) * (1 + ((tick * 7) % 11 - 5) / 1000), 4)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        params = request.query
+        function = params.get("function", "")
+        self.requests[function] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self._faults:
+            kind = self._faults.popleft()
+            if kind == "http_500":
+                return web.Response(status=500)
+            return web.json_response(FAULTS[kind])
+
+        symbol = params.get("symbol", "").upper()
+        csv = self.csv and params.get("datatype") == "csv"
+        if function == "GLOBAL_QUOTE":
+            return web.json_response({"Global Quote": self._global_quote(symbol)})
+        if function == "REALTIME_BULK_QUOTES":
+            if not self.bulk:
+                return web.json_response(FAULTS["premium"])
+            symbols = [item for item in symbol.split(",") if item]
+            if csv:
+                return _csv_response([self._bulk_quote(item) for item in symbols])
+            return web.json_response(
+                {"endpoint": "Realtime Bulk Quotes", "data": [self._bulk_quote(item) for item in symbols]}
+            )
+        if function == "TIME_SERIES_DAILY":
+            full = params.get("outputsize") == "full"
+            if full and not self.full_history:
+                return web.json_response(FAULTS["premium"])
+            series = self._daily(symbol, FULL_BARS if full else COMPACT_BARS)
+            if csv:
+                # Newest bar first, like the real API
+                return _csv_response(
+                    [
+                        {"timestamp": day, **{key.split(". ")[1]: value for key, value in values.items()}}
+                        for day, values in reversed(series.items())
+                    ]
+                )
+            return web.json_response({"Time Series (Daily)": series})
+        return web.json_response(FAULTS["error"])
+
+    def _global_quote(self, symbol: str) -> dict:
+        price = self._price(symbol)
+        previous = _base_price(symbol)
+        return {
+            "01. symbol": symbol,
+            "02. open": f"{previous:.4f}",
+            "03. high": f"{max(price, previous):.4f}",
+            "04. low": f"{min(price, previous):.4f}",
+            "05. price": f"{price:.4f}",
+            "06. volume": str(1000 + self._ticks[symbol]),
+            "07. latest trading day": date.today().isoformat(),
+            "08. previous close": f"{previous:.4f}",
+            "09. change": f"{price - previous:.4f}",
+            "10. change percent": f"{(price / previous - 1) * 100:.4f}%",
+        }
+
+    def _bulk_quote(self, symbol: str) -> dict:
+        price = self._price(symbol)
+        previous = _base_price(symbol)
+        return {
+            "symbol": symbol,
+            "timestamp": f"{date.today().isoformat()} 15:59:59.000",
+            "open": f"{previous:.4f}",
+            "high": f"{max(price, previous):.4f}",
+            "low": f"{min(price, previous):.4f}",
+            "close": f"{price:.4f}",
+            "volume": str(1000 + self._ticks[symbol]),
+            "previous_close": f"{previous:.4f}",
+            "change": f"{price - previous:.4f}",
+            "change_percent": f"{(price / previous - 1) * 100:.4f}",
+        }
+
+    def _daily(self, symbol: str, count: int) -> dict:
+        base = _base_price(symbol)
+        series = {}
+        for index, day in enumerate(_trading_days(count, date.today() - timedelta(days=1))):
+            close = base * (1 + ((index * 13) % 17 - 8) / 200)
+            series[day.isoformat()] = {
+                "1. open": f"{base:.4f}",
+                "2. high": f"{max(base, close):.4f}",
+                "3. low": f"{min(base, close):.4f}",
+                "4. close": f"{close:.4f}",
+                "5. volume": str(10000 + index),
+            }
+        return series
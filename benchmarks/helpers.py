@@ -0,0 +1,57 @@
+"""Measurement helpers for the offline benchmarks."""
+from __future__ import annotations
+
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+RESULTS: list[dict] = []
+
+
+@dataclass
+class RefreshResult:
+    """Measurements of one refresh of all config entries."""
+
+    wall_time: float = 0.0
+    requests: int = 0
+    states_written: int = 0
+    states_skipped: int = 0
+    peak_memory: int = 0
+
+
+def age_quotes(hass, seconds: float) -> None:
+    """Make every cached quote look seconds older, as if time had passed."""
+    from custom_components.alpha_vantage.const import DATA_QUOTE_CACHE, DOMAIN
+
+    for entry in hass.data[DOMAIN][DATA_QUOTE_CACHE]._entries.values():
+        entry["fetched"] -= seconds
+
+
+async def measure_refresh(hass, fake, coordinators) -> RefreshResult:
+    """Refresh all coordinators once and measure it."""
+    written = sum(coordinator.changes.states_written for coordinator in coordinators)
+    skipped = sum(coordinator.changes.states_skipped for coordinator in coordinators)
+    requests = fake.total_requests
+    age_quotes(hass, 3600)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for coordinator in coordinators:
+        await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    wall_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return RefreshResult(
+        wall_time=wall_time,
+        requests=fake.total_requests - requests,
+        states_written=sum(c.changes.states_written for c in coordinators) - written,
+        states_skipped=sum(c.changes.states_skipped for c in coordinators) - skipped,
+        peak_memory=peak,
+    )
+
+
+def record(name: str, result: RefreshResult) -> None:
+    """Keep a result for the summary table."""
+    RESULTS.append({"name": name, **asdict(result)})
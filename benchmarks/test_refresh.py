@@ -0,0 +1,216 @@
+"""Refresh benchmarks against the stand-in Alpha Vantage server."""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+import tracemalloc
+
+import pytest
+from homeassistant.helpers import entity_registry as er
+
+from fake_alpha_vantage import FULL_BARS
+from helpers import RefreshResult, measure_refresh, record
+
+DEFAULT_SENSOR_COUNT = 3  # price, change, change_percent
+
+
+def watchlists(entries: int, size: int) -> list[list[str]]:
+    """Return a distinct watchlist of size symbols per entry."""
+    return [[f"E{entry}S{index}" for index in range(size)] for entry in range(entries)]
+
+
+@pytest.mark.parametrize(
+    ("entries", "size"),
+    [(1, 1), (1, 10), (1, 100), (1, 1000), (10, 10), (10, 100), (50, 20)],
+)
+async def test_bulk_refresh(hass, fake_api, setup_entries, entries, size):
+    """Refresh watchlists on a plan with REALTIME_BULK_QUOTES."""
+    coordinators = await setup_entries(entries, watchlists(entries, size))
+
+    result = await measure_refresh(hass, fake_api, coordinators)
+    record(f"bulk {entries}x{size}", result)
+
+    assert result.requests == entries * math.ceil(size / 100)
+    assert result.states_written <= entries * size * DEFAULT_SENSOR_COUNT
+    for coordinator in coordinators:
+        assert len(coordinator.data["symbols"]) == size
+
+
+@pytest.mark.parametrize(("size", "latency"), [(1, 0), (10, 0), (100, 0), (10, 0.05)])
+async def test_single_quote_refresh(hass, fake_api, setup_entries, size, latency):
+    """Refresh a watchlist one GLOBAL_QUOTE request per symbol."""
+    fake_api.bulk = False
+    coordinators = await setup_entries(1, watchlists(1, size))
+    fake_api.latency = latency
+
+    result = await measure_refresh(hass, fake_api, coordinators)
+    record(f"single {size} latency {latency}s", result)
+
+    assert result.requests == size
+
+
+async def test_unchanged_quotes_skip_writes(hass, fake_api, setup_entries):
+    """Quotes that did not move do not write states."""
+    fake_api.moving = False
+    coordinators = await setup_entries(1, watchlists(1, 100))
+
+    result = await measure_refresh(hass, fake_api, coordinators)
+    record("unchanged 1x100", result)
+
+    assert result.states_written == 0
+    assert result.states_skipped == 100 * DEFAULT_SENSOR_COUNT
+
+
+async def test_shared_api_key_fetches_once(hass, fake_api, setup_entries):
+    """Entries sharing an API key and symbols only fetch them once."""
+    symbols = watchlists(1, 50)[0]
+    coordinators = await setup_entries(2, [symbols, symbols], api_key="bench-shared")
+
+    result = await measure_refresh(hass, fake_api, coordinators)
+    record("shared key 2x50", result)
+
+    assert result.requests == 1
+    # Both entries have their own sensors, fed with the same quotes
+    registry = er.async_get(hass)
+    for coordinator in coordinators:
+        entities = er.async_entries_for_config_entry(registry, coordinator.config_entry.entry_id)
+        states = [hass.states.get(entity.entity_id) for entity in entities if entity.entity_category is None]
+        states = [state for state in states if state is not None and state.state != "unavailable"]
+        assert len(states) == len(symbols) * DEFAULT_SENSOR_COUNT
+
+
+async def test_history_refresh(hass, fake_api, setup_entries):
+    """Completed sessions are not fetched again once they are stored."""
+    coordinators = await setup_entries(
+        1, watchlists(1, 100), show_sensors=["price", "sma_50", "rsi_14"]
+    )
+    assert fake_api.requests["TIME_SERIES_DAILY"] == 100
+
+    result = await measure_refresh(hass, fake_api, coordinators)
+    record("history 1x100", result)
+
+    assert result.requests == 1
+    assert len(coordinators[0].data["indicators"]) == 100
+
+
+@pytest.mark.parametrize("kind", ["note", "information", "error", "http_500"])
+async def test_failed_refresh_keeps_quotes(hass, fake_api, setup_entries, kind):
+    """A failed request keeps the last known quotes, marked stale."""
+    coordinators = await setup_entries(1, watchlists(1, 10))
+    fake_api.fail_next(kind)
+
+    result = await measure_refresh(hass, fake_api, coordinators)
+    record(f"fault {kind}", result)
+
+    assert result.requests == 1
+    # Only the stale attribute changed
+    assert result.states_written == 10 * DEFAULT_SENSOR_COUNT
+    assert len(coordinators[0].data["symbols"]) == 10
+    assert set(coordinators[0].stale) == set(watchlists(1, 10)[0])
+
+
+async def test_invalid_key_starts_reauth(hass, fake_api, setup_entries):
+    """A rejected API key starts the re-auth flow."""
+    coordinators = await setup_entries(1, watchlists(1, 10))
+    fake_api.fail_next("invalid_key")
+
+    await measure_refresh(hass, fake_api, coordinators)
+
+    assert not coordinators[0].last_update_success
+    flows = hass.config_entries.flow.async_progress()
+    assert any(flow["context"]["source"] == "reauth" for flow in flows)
+
+
+async def test_options_change_applies_in_place(hass, fake_api, setup_entries):
+    """Adding symbols only fetches the new ones, without reloading the entry."""
+    symbols = watchlists(1, 100)[0]
+    coordinators = await setup_entries(1, [symbols])
+    entry = coordinators[0].config_entry
+    requests = fake_api.total_requests
+
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.data, "symbols": ",".join(symbols[2:] + ["NEW0", "NEW1"])}
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data["alpha_vantage"][entry.entry_id] is coordinators[0]
+    assert fake_api.total_requests - requests == 1
+    assert set(coordinators[0].data["symbols"]) == set(symbols[2:] + ["NEW0", "NEW1"])
+    assert hass.states.get("sensor.new0_price") is not None
+    assert hass.states.get("sensor.e0s0_price") is None
+
+
+async def test_fast_start_does_not_wait_for_the_api(hass, fake_api, setup_entries):
+    """With fast start, setup returns before the first fetch completes."""
+    fake_api.bulk = False
+    fake_api.latency = 0.05
+
+    start = time.perf_counter()
+    coordinators = await setup_entries(1, watchlists(1, 20), fast_start=True)
+    setup_time = time.perf_counter() - start
+    record("fast start setup 1x20", RefreshResult(wall_time=setup_time))
+
+    assert setup_time < 20 * fake_api.latency
+    assert hass.states.get("sensor.e0s0_price") is not None
+    # The first refresh runs as a background task, which async_block_till_done
+    # does not wait for on every Home Assistant version
+    refreshed = asyncio.Event()
+    unsubscribe = coordinators[0].async_add_listener(refreshed.set)
+    if len(coordinators[0].data["symbols"]) < 20:
+        await asyncio.wait_for(refreshed.wait(), 10)
+    unsubscribe()
+    assert len(coordinators[0].data["symbols"]) == 20
+
+
+@pytest.mark.parametrize("wire", ["csv", "json"])
+async def test_bulk_decoding_memory(hass, fake_api, setup_entries, wire):
+    """Peak memory of a large bulk refresh, streamed as CSV or decoded from JSON."""
+    fake_api.csv = wire == "csv"
+    coordinators = await setup_entries(1, watchlists(1, 1000))
+
+    result = await measure_refresh(hass, fake_api, coordinators)
+    record(f"bulk 1x1000 {wire}", result)
+
+    assert result.requests == 10
+    assert len(coordinators[0].data["symbols"]) == 1000
+
+
+async def test_full_history_decoding_memory(hass, fake_api):
+    """Streaming a full daily history as CSV peaks below decoding it from JSON."""
+    from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+    from custom_components.alpha_vantage.api import AlphaVantageClient
+
+    client = AlphaVantageClient(async_get_clientsession(hass), "bench-history")
+    peaks = {}
+    for wire in ("json", "csv"):
+        fake_api.csv = wire == "csv"
+        tracemalloc.start()
+        start = time.perf_counter()
+        bars = await client.async_get_daily_history("IBM", full=True)
+        wall_time = time.perf_counter() - start
+        _, peaks[wire] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        record(f"full history {wire}", RefreshResult(wall_time=wall_time, requests=1, peak_memory=peaks[wire]))
+        assert len(bars) == FULL_BARS
+
+    assert peaks["csv"] < peaks["json"]
+
+
+async def test_staggered_refresh_fetches_one_symbol_per_wakeup(hass, fake_api, setup_entries, freezer):
+    """Staggered symbols keep their own slots instead of refreshing together."""
+    fake_api.bulk = False
+    size = 10
+    coordinators = await setup_entries(1, watchlists(1, size), scan_interval=600, stagger=True)
+    coordinator = coordinators[0]
+
+    fetched = []
+    for _ in range(2 * size):
+        freezer.tick(coordinator.update_interval)
+        requests = fake_api.total_requests
+        await coordinator.async_refresh()
+        fetched.append(fake_api.total_requests - requests)
+    record(f"staggered 1x{size}", RefreshResult(requests=sum(fetched)))
+
+    assert fetched == [1] * 2 * size
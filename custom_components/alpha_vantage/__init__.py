@@ -1,14 +1,15 @@
 """The Alpha Vantage integration."""
-import asyncio
+import functools
 import logging
+import time
+from collections import Counter
 from datetime import timedelta
 
-import aiohttp
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN, 
@@ -16,36 +17,149 @@ from .const import (
     CONF_SYMBOLS, 
     CONF_SCAN_INTERVAL, 
     CONF_DECIMALS, 
-    API_URL, 
+    CONF_TIER,
+    CONF_CACHE_TTL,
+    CONF_MARKET_HOURS,
+    CONF_HOLIDAYS,
+    CONF_STAGGER,
+    CONF_PRIORITIES,
+    CONF_FRESHNESS,
+    CONF_HOLDINGS,
+    CONF_HOME_CURRENCY,
+    CONF_FAST_START,
+    CONF_SHOW_SENSORS,
+    DATA_HUBS,
     DEFAULT_SCAN_INTERVAL, 
-    DEFAULT_DECIMALS
+    DEFAULT_DECIMALS,
+    DEFAULT_TIER,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_MARKET_HOURS,
+    DEFAULT_STAGGER,
+    DEFAULT_FAST_START,
+    DEFAULT_SENSORS,
+    SENSOR_TYPES,
 )
+from .api import PremiumEndpointError
+from .breaker import STATE_OPEN
+from .budget import api_key_id
+from .changes import ChangeTracker
+from .fx import price_scale, symbol_currency
+from .history import async_get_history_store
+from .hub import async_get_pool
+from .indicators import IndicatorEngine
+from .market_hours import MarketCalendar, is_currency_pair
+from .portfolio import PORTFOLIO, parse_holdings, portfolio_stats
+from .scheduler import RefreshScheduler, parse_symbol_settings
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["sensor"]
 
+# Options that change the client or the sensor units need a reload of the entry
+RELOAD_OPTIONS = (CONF_API_KEY, CONF_TIER, CONF_HOME_CURRENCY)
+
+
+def _entry_options(entry):
+    """Return the settings of an entry, options taking precedence over data."""
+    # Use options if available, otherwise fallback to data
+    return {
+        CONF_API_KEY: entry.options.get(CONF_API_KEY, entry.data[CONF_API_KEY]),
+        CONF_SYMBOLS: entry.options.get(CONF_SYMBOLS, entry.data[CONF_SYMBOLS]),
+        CONF_SCAN_INTERVAL: entry.options.get(CONF_SCAN_INTERVAL, entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)),
+        CONF_DECIMALS: entry.options.get(CONF_DECIMALS, entry.data.get(CONF_DECIMALS, DEFAULT_DECIMALS)),
+        CONF_TIER: entry.options.get(CONF_TIER, entry.data.get(CONF_TIER, DEFAULT_TIER)),
+        CONF_CACHE_TTL: entry.options.get(CONF_CACHE_TTL, entry.data.get(CONF_CACHE_TTL, DEFAULT_CACHE_TTL)),
+        CONF_MARKET_HOURS: entry.options.get(CONF_MARKET_HOURS, entry.data.get(CONF_MARKET_HOURS, DEFAULT_MARKET_HOURS)),
+        CONF_HOLIDAYS: entry.options.get(CONF_HOLIDAYS, entry.data.get(CONF_HOLIDAYS, "")),
+        CONF_STAGGER: entry.options.get(CONF_STAGGER, entry.data.get(CONF_STAGGER, DEFAULT_STAGGER)),
+        CONF_SHOW_SENSORS: entry.options.get(CONF_SHOW_SENSORS, entry.data.get(CONF_SHOW_SENSORS, DEFAULT_SENSORS)),
+        CONF_PRIORITIES: entry.options.get(CONF_PRIORITIES, entry.data.get(CONF_PRIORITIES, "")),
+        CONF_FRESHNESS: entry.options.get(CONF_FRESHNESS, entry.data.get(CONF_FRESHNESS, "")),
+        CONF_HOLDINGS: entry.options.get(CONF_HOLDINGS, entry.data.get(CONF_HOLDINGS, "")),
+        CONF_HOME_CURRENCY: entry.options.get(CONF_HOME_CURRENCY, entry.data.get(CONF_HOME_CURRENCY, "")),
+        CONF_FAST_START: entry.options.get(CONF_FAST_START, entry.data.get(CONF_FAST_START, DEFAULT_FAST_START)),
+    }
+
+
+def _scheduler_settings(options):
+    """Return the RefreshScheduler arguments for the entry settings."""
+    return {
+        "interval": timedelta(seconds=options[CONF_SCAN_INTERVAL]),
+        "calendar": MarketCalendar(options[CONF_HOLIDAYS]) if options[CONF_MARKET_HOURS] else None,
+        "stagger": options[CONF_STAGGER],
+        "priorities": parse_symbol_settings(options[CONF_PRIORITIES]),
+        "freshness": {
+            symbol: int(value) for symbol, value in parse_symbol_settings(options[CONF_FRESHNESS]).items()
+        },
+    }
+
+
+def _sensor_categories(show_sensors):
+    """Return the sensor categories of the enabled sensors."""
+    return {SENSOR_TYPES[sensor]["category"] for sensor in show_sensors if sensor in SENSOR_TYPES}
+
+
+def _parse_symbols(symbols):
+    """Return the symbols of a comma-separated list, upper case."""
+    return [s.strip().upper() for s in symbols.split(",")]
+
+
+async def _async_migrate_unique_ids(hass, entry):
+    """Scope the unique IDs of symbol sensors created before they included the entry."""
+    prefix = f"{DOMAIN}_{entry.entry_id}_"
+
+    @callback
+    def _migrate(entity_entry):
+        if entity_entry.unique_id.startswith(prefix):
+            return None
+        return {"new_unique_id": prefix + entity_entry.unique_id.removeprefix(f"{DOMAIN}_")}
+
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Alpha Vantage from a config entry."""
-    session = async_get_clientsession(hass)
-    
-    # Use options if available, otherwise fallback to data
-    api_key = entry.options.get(CONF_API_KEY, entry.data[CONF_API_KEY])
-    symbols = entry.options.get(CONF_SYMBOLS, entry.data[CONF_SYMBOLS])
-    scan_interval = entry.options.get(CONF_SCAN_INTERVAL, entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
-    decimals = entry.options.get(CONF_DECIMALS, entry.data.get(CONF_DECIMALS, DEFAULT_DECIMALS))
+    options = _entry_options(entry)
+
+    # Entries sharing an API key share one hub, and with it the quota and
+    # the quotes of symbols they have in common. An entry with several keys
+    # spreads its requests over their hubs.
+    pool = await async_get_pool(hass, options[CONF_API_KEY], options[CONF_TIER])
+    scheduler = RefreshScheduler(**_scheduler_settings(options))
+    # Daily history is only fetched when a sensor computed from it is enabled
+    categories = _sensor_categories(options[CONF_SHOW_SENSORS])
+    history = None
+    if categories & {"history", "indicators"}:
+        history = await async_get_history_store(hass)
 
     coordinator = AlphaVantageDataUpdateCoordinator(
         hass,
-        session,
-        api_key=api_key,
-        symbols=symbols,
-        scan_interval=scan_interval,
-        decimals=decimals,
-        config_entry=entry
+        pool,
+        api_key=options[CONF_API_KEY],
+        symbols=options[CONF_SYMBOLS],
+        scan_interval=options[CONF_SCAN_INTERVAL],
+        decimals=options[CONF_DECIMALS],
+        config_entry=entry,
+        cache_ttl=options[CONF_CACHE_TTL],
+        scheduler=scheduler,
+        history=history,
+        indicators="indicators" in categories,
+        holdings=parse_holdings(options[CONF_HOLDINGS]),
+        home_currency=options[CONF_HOME_CURRENCY],
     )
+    coordinator.options = options
 
-    await coordinator.async_config_entry_first_refresh()
+    pool.register(coordinator)
+    if options[CONF_FAST_START]:
+        # Sensors start from the cached quotes or their restored state, so
+        # startup does not wait for the API
+        coordinator.async_seed_from_cache()
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            pool.unregister(coordinator)
+            raise
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -53,96 +167,544 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Register update listener
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
+    await _async_migrate_unique_ids(hass, entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if options[CONF_FAST_START]:
+        # Cancelled if the entry is unloaded before the fetch completes
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
+
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.pool.unregister(coordinator)
+        for hub in coordinator.pool.hubs:
+            if not hub.coordinators:
+                hass.data[DOMAIN][DATA_HUBS].pop(api_key_id(hub.client.api_key), None)
 
     return unload_ok
 
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply changed options in place, reloading the entry only when needed."""
+    coordinator = hass.data[DOMAIN].get(entry.entry_id)
+    options = _entry_options(entry)
+    if coordinator is None or any(options[key] != coordinator.options[key] for key in RELOAD_OPTIONS):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    if options != coordinator.options:
+        await coordinator.async_apply_options(options)
 
 class AlphaVantageDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Alpha Vantage data."""
 
-    def __init__(self, hass, session, api_key, symbols, scan_interval, decimals, config_entry):
+    def __init__(
+        self,
+        hass,
+        pool,
+        api_key,
+        symbols,
+        scan_interval,
+        decimals,
+        config_entry,
+        cache_ttl,
+        scheduler,
+        history=None,
+        indicators=False,
+        holdings=None,
+        home_currency=None,
+    ):
         """Initialize the coordinator."""
-        self.session = session
-        self.api_key = api_key
-        self.symbols = [s.strip().upper() for s in symbols.split(",")]
+        self.pool = pool
+        self.api_key = api_key  # the API key option, one or more keys
+        self.symbols = _parse_symbols(symbols)
         self.decimals = decimals
         self.config_entry = config_entry
-        self._last_success = True  # Track status to reduce log noise
+        self.cache = pool.cache
+        self.cache_ttl = cache_ttl
+        self.scheduler = scheduler
+        self.history = history
+        self.indicators = IndicatorEngine(self.symbols) if indicators else None
+        # symbol -> (quantity, cost basis per share) of the held symbols
+        self.holdings = self._held(holdings)
+        # Amounts of money are shown in this currency when set
+        self.home_currency = home_currency.upper() if home_currency else None
+        self.rates = {}  # currency -> exchange rate into the home currency
+        # History needs to know completed sessions even if polling ignores market hours
+        self.calendar = scheduler.calendar or MarketCalendar()
+        self.scan_interval = timedelta(seconds=scan_interval)
+        self.changes = ChangeTracker()
+        self.changed_sensors = {}  # symbol -> sensor types whose state changed in the last refresh
+        self.stale = {}  # symbol -> epoch time of the quote shown while its refresh is retried
+        # Timing of the last refresh, shown by the diagnostic sensors
+        self.refresh_duration = None
+        self.refresh_requests = 0
+        # Request accounting of the running update cycle, per hub
+        self._cycle_requests = Counter()
+        self._cycle_allowance = {}
+        self._cycle_deadline = 0.0
+        self.options = {}  # settings the coordinator runs with, see async_apply_options
+        self._first_refresh = True  # Cached quotes within cache_ttl are reused until a refresh succeeded
+        self._entity_listeners = []
         
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=scan_interval),
+            update_interval=self.scan_interval,
         )
 
     async def _async_update_data(self):
         """Fetch data from API."""
-        
-        async def fetch_symbol_data(symbol):
-            """Fetch data for a single symbol."""
-            params = {
-                "function": "GLOBAL_QUOTE",
-                "symbol": symbol,
-                "apikey": self.api_key
-            }
+        # Refreshed quotes are merged into the existing data, so symbols that
+        # are not due keep their last known quote.
+        started = time.monotonic()
+        now = dt_util.utcnow()
+        first_refresh = self._first_refresh
+        data = self.data or {"symbols": {}}
+        symbols_data = data["symbols"]
+        updated = set()
+        # Planned first, so the periods apply to the quotes taken in this cycle
+        self.scheduler.plan(self.symbols, self._request_rate())
+
+        to_fetch = []
+        for symbol in self.symbols:
+            if first_refresh:
+                # First refresh after startup or reload: reuse recently cached quotes
+                cached = self.cache.get_fresh(symbol, self.cache_ttl)
+                if cached is not None:
+                    symbols_data[symbol] = cached
+                    updated.add(symbol)
+                    self.scheduler.mark_fetched(symbol, now, self._quote_fetched_at(symbol))
+                    continue
+            if self.scheduler.is_due(symbol, self.cache, now):
+                to_fetch.append(symbol)
+            elif symbol not in symbols_data and self.cache.get(symbol) is not None:
+                symbols_data[symbol] = self.cache.get(symbol)
+                updated.add(symbol)
+
+        # Fetch symbols sequentially, as far as the shared request budget allows.
+        # Higher priorities go first, then the symbols that were refreshed
+        # longest ago, so symbols deferred in this cycle are picked up in the next one.
+        self._start_cycle()
+        # Symbols whose exchange rate moved show new converted values
+        rate_changed = set()
+        if self.home_currency:
+            rate_changed = await self._async_update_rates(first_refresh)
+            updated.update(rate_changed)
+        order = sorted(
+            to_fetch, key=lambda symbol: (-self.scheduler.weight(symbol), self.cache.fetched_at(symbol))
+        )
+
+        # Quotes another entry fetched within half an interval, or half the
+        # symbol's period, are reused
+        quotes, deferred = await self.pool.async_get_quotes(
+            order,
+            self._async_acquire,
+            functools.partial(self.scheduler.reuse_age, now=now),
+            self,
+            self._capacity,
+        )
+        fetched_at = dt_util.utcnow()
+        stale_before = set(self.stale)
+        for symbol, quote in quotes.items():
+            symbols_data[symbol] = quote
+            updated.add(symbol)
+            self.stale.pop(symbol, None)
+            self.scheduler.mark_fetched(symbol, fetched_at, self._quote_fetched_at(symbol))
+
+        # Failed symbols are retried with backoff; until then the last good
+        # quote is carried forward and marked stale
+        for symbol in order:
+            if symbol in quotes or symbol in deferred:
+                continue
+            retry_at = self.scheduler.mark_failed(symbol, fetched_at)
+            _LOGGER.debug("Fetching %s failed, retrying at %s", symbol, retry_at)
+            if symbol not in symbols_data and self.cache.get(symbol) is not None:
+                symbols_data[symbol] = self.cache.get(symbol)
+            if symbol in symbols_data:
+                self.stale[symbol] = self.cache.fetched_at(symbol)
+        # Sensors of symbols that became stale or fresh again show it in their attributes
+        updated.update(set(self.stale) ^ stale_before)
+
+        if deferred:
+            _LOGGER.debug(
+                "Request budget exhausted for this cycle, deferring %s", ", ".join(deferred)
+            )
+            # Keep showing the last known data for symbols waiting for their turn
+            for symbol in deferred:
+                if symbol not in symbols_data and self.cache.get(symbol) is not None:
+                    symbols_data[symbol] = self.cache.get(symbol)
+                    updated.add(symbol)
+
+        # Daily bars come after the quotes, with whatever budget is left
+        history_updated = set()
+        indicators_updated = set()
+        if self.history is not None:
+            history_updated = await self._async_update_history(data, first_refresh)
+        if self.indicators is not None:
+            # One vectorized pass over the bars added since the last refresh
+            indicators_data = data.setdefault("indicators", {})
+            for symbol in self.indicators.advance(self.history):
+                indicators_data[symbol] = self.indicators.stats(symbol)
+                indicators_updated.add(symbol)
+
+        now = dt_util.utcnow()
+        self.scheduler.spread(self.symbols, now)
+        self.update_interval = self.scheduler.next_refresh(self.symbols, self.cache, now)
+        if self.pool.breaker_state == STATE_OPEN:
+            # Nothing can be fetched before the daily quota of a key resets
+            self.update_interval = max(self.update_interval, self.pool.reset_at - now)
+        self.changed_sensors = self._diff(
+            data,
+            updated,
+            {
+                "history": history_updated | (rate_changed & set(data.get("history", {}))),
+                "indicators": indicators_updated | (rate_changed & set(data.get("indicators", {}))),
+            },
+        )
+        if self.holdings:
+            self._update_portfolio(data)
+
+        self.refresh_duration = time.monotonic() - started
+        self.refresh_requests = sum(self._cycle_requests.values())
+
+        if not symbols_data:
+            # Failed requests are logged once per outage by the hub
+            raise UpdateFailed("Failed to fetch any data from Alpha Vantage. Likely rate limited.")
+
+        self._first_refresh = False
+        return data
+
+    @callback
+    def async_seed_from_cache(self):
+        """Start with the cached quotes, before anything has been fetched.
+
+        The first refresh then only replaces the quotes that are due.
+        Symbols without a cached quote keep the state their sensors restore.
+        """
+        symbols_data = {}
+        for symbol in self.symbols:
+            quote = self.cache.get(symbol)
+            if quote is None:
+                continue
+            symbols_data[symbol] = quote
+            currency = symbol_currency(symbol)
+            if self.home_currency and currency not in (None, self.home_currency):
+                rate = self.cache.get(f"{currency}/{self.home_currency}")
+                if rate is not None and rate.price:
+                    self.rates[currency] = rate.price
+        data = {"symbols": symbols_data}
+        self.changed_sensors = self._diff(data, set(symbols_data), {})
+        if self.holdings:
+            self._update_portfolio(data)
+        self.data = data
+
+    def _diff(self, data, updated, categories):
+        """Return the sensor types per symbol whose state changed.
+
+        updated are the symbols whose quote may have changed, categories maps
+        the history and indicator categories to their recomputed symbols.
+        """
+        symbols_data = data["symbols"]
+        changed = {
+            symbol: self.changes.diff(
+                symbol,
+                symbols_data[symbol],
+                self.decimals,
+                stale=symbol in self.stale,
+                rate=self.rate_for(symbol),
+            )
+            for symbol in updated
+            if symbol in symbols_data
+        }
+        for category, symbols in categories.items():
+            for symbol in symbols:
+                changed.setdefault(symbol, set()).update(
+                    self.changes.diff(
+                        symbol, data[category][symbol], self.decimals, category, rate=self.rate_for(symbol)
+                    )
+                )
+        return changed
+
+    def _held(self, holdings):
+        """Return the holdings of the tracked symbols."""
+        return {symbol: holding for symbol, holding in (holdings or {}).items() if symbol in self.symbols}
+
+    @callback
+    def async_add_entity_listener(self, listener):
+        """Call listener after the options changed the sensors the entry needs."""
+        self._entity_listeners.append(listener)
+        return lambda: self._entity_listeners.remove(listener)
+
+    async def async_apply_options(self, options):
+        """Apply changed options without reloading the entry.
+
+        Symbols that are still tracked keep their quotes and schedule, only
+        added symbols are fetched, and the sensor platform adds or removes
+        the sensors that changed.
+        """
+        symbols = _parse_symbols(options[CONF_SYMBOLS])
+        added = [symbol for symbol in symbols if symbol not in self.symbols]
+        removed = set(self.symbols) - set(symbols)
+        _LOGGER.debug("Applying options in place, added %s, removed %s", added, removed)
+        self.options = options
+        self.symbols = symbols
+        self.decimals = options[CONF_DECIMALS]
+        self.cache_ttl = options[CONF_CACHE_TTL]
+        self.scan_interval = timedelta(seconds=options[CONF_SCAN_INTERVAL])
+        self.scheduler.configure(**_scheduler_settings(options))
+        self.calendar = self.scheduler.calendar or MarketCalendar()
+        self.holdings = self._held(parse_holdings(options[CONF_HOLDINGS]))
+
+        categories = _sensor_categories(options[CONF_SHOW_SENSORS])
+        if not categories & {"history", "indicators"}:
+            self.history = None
+        elif self.history is None:
+            self.history = await async_get_history_store(self.hass)
+        if "indicators" not in categories:
+            self.indicators = None
+        elif self.indicators is None or added or removed:
+            # Rebuilt from the stored bars, without requests
+            self.indicators = IndicatorEngine(self.symbols)
+
+        data = self.data or {"symbols": {}}
+        for symbol in removed:
+            for values in data.values():
+                values.pop(symbol, None)
+            self.stale.pop(symbol, None)
+            self.scheduler.forget(symbol)
+        for category in ("history", "indicators"):
+            if category not in categories:
+                data.pop(category, None)
+        # Recomputed below for the new holdings
+        data.pop("portfolio", None)
+
+        self._start_cycle()
+        self.scheduler.plan(self.symbols, self._request_rate())
+        if self.home_currency:
+            await self._async_update_rates(False)
+        if added:
+            await self._async_fetch_added(data, added)
+
+        for listener in self._entity_listeners:
+            listener()
+        # New decimals or symbols change the states of the remaining sensors
+        self.changed_sensors = self._diff(
+            data,
+            set(data["symbols"]),
+            {category: set(data[category]) for category in ("history", "indicators") if category in data},
+        )
+        if self.holdings:
+            self._update_portfolio(data)
+
+        now = dt_util.utcnow()
+        self.scheduler.spread(self.symbols, now)
+        self.update_interval = self.scheduler.next_refresh(self.symbols, self.cache, now)
+        self.async_set_updated_data(data)
+
+    async def _async_fetch_added(self, data, symbols):
+        """Fetch the quotes of added symbols, reusing recently cached ones."""
+        quotes, _ = await self.pool.async_get_quotes(
+            symbols, self._async_acquire, self.cache_ttl, self, self._capacity
+        )
+        fetched_at = dt_util.utcnow()
+        for symbol, quote in quotes.items():
+            data["symbols"][symbol] = quote
+            self.scheduler.mark_fetched(symbol, fetched_at, self._quote_fetched_at(symbol))
+        # Symbols that could not be fetched now are due in the next refresh
+
+    def _quote_fetched_at(self, symbol):
+        """Return when the cached quote of a symbol was fetched."""
+        return dt_util.utc_from_timestamp(self.cache.fetched_at(symbol))
+
+    def _start_cycle(self):
+        """Reset the request accounting for an update cycle."""
+        self._cycle_requests.clear()
+        self._cycle_allowance = {
+            hub: hub.budget.requests_for_cycle(self.update_interval) for hub in self.pool.hubs
+        }
+        # Leave some headroom so a cycle never runs into the next one
+        self._cycle_deadline = time.monotonic() + self.scan_interval.total_seconds() * 0.8
+
+    def rate_for(self, symbol):
+        """Return the factor converting the prices of a symbol into the home currency.
+
+        1.0 without a home currency and for currency pairs, None while the
+        exchange rate is not known yet.
+        """
+        currency = symbol_currency(symbol)
+        if not self.home_currency or currency is None:
+            return 1.0
+        if currency == self.home_currency:
+            return price_scale(symbol)
+        rate = self.rates.get(currency)
+        return rate * price_scale(symbol) if rate is not None else None
+
+    async def _async_update_rates(self, first_refresh):
+        """Fetch the exchange rates into the home currency, once per interval.
+
+        Rates are quotes of currency pairs such as GBP/EUR. They share the
+        quote cache and request coalescing of the hubs, so each pair is only
+        requested once per interval however many symbols or entries need it.
+        Returns the symbols whose exchange rate changed.
+        """
+        pairs = {}
+        for symbol in self.symbols:
+            currency = symbol_currency(symbol)
+            if currency is not None and currency != self.home_currency:
+                pairs[currency] = f"{currency}/{self.home_currency}"
+        if not pairs:
+            return set()
+        max_age = self.scan_interval.total_seconds()
+        if first_refresh:
+            max_age = max(max_age, self.cache_ttl)
+        quotes, _ = await self.pool.async_get_quotes(
+            list(pairs.values()), self._async_acquire, max_age, self, self._capacity
+        )
+
+        changed = set()
+        for currency, pair in pairs.items():
+            # Keep converting with the last known rate while a pair cannot be fetched
+            quote = quotes.get(pair) or self.cache.get(pair)
+            if quote is not None and quote.price and quote.price != self.rates.get(currency):
+                self.rates[currency] = quote.price
+                changed.add(currency)
+        return {symbol for symbol in self.symbols if symbol_currency(symbol) in changed}
+
+    def _request_rate(self):
+        """Return this entry's share of the request rate the daily quotas allow."""
+        return self.pool.request_rate(self.symbols)
+
+    def _capacity(self, hub):
+        """Return the requests left for a hub in this cycle, None without a daily limit."""
+        allowance = self._cycle_allowance.get(hub)
+        if allowance is None:
+            return None
+        return max(allowance - self._cycle_requests[hub], 0)
+
+    async def _async_acquire(self, hub):
+        """Reserve a request slot of a hub for this cycle."""
+        if self._capacity(hub) == 0:
+            return False
+        if not hub.breaker.allow_request():
+            # The daily quota of the key is used up
+            return False
+        started = time.monotonic()
+        acquired = await hub.budget.async_acquire(max_wait=self._cycle_deadline - time.monotonic())
+        hub.client.metrics.observe_wait(time.monotonic() - started)
+        if not acquired:
+            hub.breaker.record_failure()
+            return False
+        self._cycle_requests[hub] += 1
+        return True
+
+    @callback
+    def async_start_key_reauth(self, api_key):
+        """Ask for a replacement of one rejected key of the pool.
+
+        The other keys keep serving the entry in the meantime.
+        """
+        self.config_entry.async_start_reauth(self.hass, data={**self.config_entry.data, "failed_key": api_key})
+
+    def diagnostic_values(self):
+        """Return the values of the diagnostic sensors."""
+        metrics = self.pool.metrics
+        latency = metrics.total_latency
+        return {
+            "refresh_duration": self.refresh_duration,
+            "refresh_requests": self.refresh_requests,
+            "request_latency": latency.mean * 1000 if latency.count else None,
+            "decode_time": metrics.mean_decode_time * 1000 if metrics.decode_count else None,
+            "rate_limit_wait": metrics.wait_time,
+            "requests_remaining_minute": self.pool.remaining_this_minute,
+            "requests_remaining_today": self.pool.remaining_today,
+            "request_failures": sum(metrics.failures.values()),
+            "request_breaker": self.pool.breaker_state,
+            "planned_freshness": max(
+                (period.total_seconds() for period in self.scheduler.periods.values()), default=None
+            ),
+        }
+
+    @callback
+    def async_push_quotes(self, quotes):
+        """Take over quotes another entry sharing the API key has fetched."""
+        if not self.data:
+            return
+        symbols_data = self.data["symbols"]
+        fetched_at = dt_util.utcnow()
+        changed = {}
+        for symbol, quote in quotes.items():
+            if symbol not in self.symbols:
+                continue
+            symbols_data[symbol] = quote
+            self.stale.pop(symbol, None)
+            self.scheduler.mark_fetched(symbol, fetched_at)
+            changed[symbol] = self.changes.diff(symbol, quote, self.decimals, rate=self.rate_for(symbol))
+        if not any(changed.values()):
+            return
+        self.changed_sensors = changed
+        if self.holdings:
+            self._update_portfolio(self.data)
+        self.async_update_listeners()
+
+    def _update_portfolio(self, data):
+        """Recompute the portfolio totals when a quote of a held symbol changed."""
+        portfolio_data = data.setdefault("portfolio", {})
+        if PORTFOLIO in portfolio_data and not any(
+            self.changed_sensors.get(symbol) for symbol in self.holdings
+        ):
+            return
+        portfolio_data[PORTFOLIO] = portfolio_stats(self.holdings, data["symbols"], self.rate_for)
+        changed = self.changes.diff(PORTFOLIO, portfolio_data[PORTFOLIO], self.decimals, "portfolio")
+        if changed:
+            self.changed_sensors.setdefault(PORTFOLIO, set()).update(changed)
+
+    async def _async_update_history(self, data, first_refresh):
+        """Fetch missing daily bars and recompute the history metrics.
+
+        The first fetch of a symbol asks for the full history when the API
+        key allows it, later fetches only for the latest 100 bars. Returns
+        the symbols whose metrics were recomputed.
+        """
+        history_data = data.setdefault("history", {})
+        now = dt_util.utcnow()
+        appended = set()
+        for symbol in self.symbols:
+            # TIME_SERIES_DAILY only covers equities
+            if is_currency_pair(symbol) or not self.history.is_due(symbol, self.calendar, now):
+                continue
+            # Daily bars go to the key with the most requests left
+            hub = self.pool.pick(self._capacity)
+            if hub is None or not await self._async_acquire(hub):
+                break
+            history = self.history.get(symbol)
+            full = not history and hub.client.full_history_supported
             try:
-                async with self.session.get(API_URL, params=params, timeout=10) as response:
-                    if response.status != 200:
-                        _LOGGER.error("Error fetching %s: %s", symbol, response.status)
-                        return None
-                    data = await response.json()
-                    if "Global Quote" in data:
-                        return data["Global Quote"]
-                    elif "Note" in data:
-                        # Rate limit notes are warnings
-                        _LOGGER.warning("Alpha Vantage API Note: %s", data["Note"])
-                    elif "Error Message" in data:
-                        msg = data["Error Message"]
-                        _LOGGER.error("Alpha Vantage API Error for %s: %s", symbol, msg)
-                        # Detect invalid API Key to trigger re-auth flow
-                        if "the apikey parameter" in msg.lower():
-                             raise ConfigEntryAuthFailed(f"Invalid API Key: {msg}")
-                    return None
-            except Exception as err:
-                if self._last_success:
-                    _LOGGER.error("Error communicating with Alpha Vantage: %s", err)
-                    self._last_success = False
-                else:
-                    _LOGGER.debug("Still failing to communicate with Alpha Vantage: %s", err)
-                return None
-
-        # Fetch symbols sequentially to respect rate limits
-        final_data = {"symbols": {}}
-        
+                bars = await self.pool.async_call(
+                    hub, hub.client.async_get_daily_history(symbol, full), symbol, self
+                )
+            except PremiumEndpointError:
+                _LOGGER.info(
+                    "Full daily history is not available for this API key, using the latest 100 days"
+                )
+                if not await self._async_acquire(hub):
+                    break
+                bars = await self.pool.async_call(
+                    hub, hub.client.async_get_daily_history(symbol), symbol, self
+                )
+            if bars is not None and self.history.update(symbol, bars, self.calendar, now):
+                appended.add(symbol)
+
+        updated = set()
         for symbol in self.symbols:
-            data = await fetch_symbol_data(symbol)
-            if data:
-                final_data["symbols"][symbol] = data
-            
-            # If we have more symbols to fetch, wait a bit to avoid hitting 5 requests/min limit
-            # 12 seconds would be perfect for 5/min, but let's try 1 second first 
-            # as some users might have premium or the limiter might be less strict for bursts.
-            # We will handle the "Note" (rate limit) in fetch_symbol_data.
-            if len(self.symbols) > 1 and symbol != self.symbols[-1]:
-                await asyncio.sleep(2)  # Small delay between requests
-
-        if not final_data["symbols"]:
-            if self._last_success:
-                raise UpdateFailed("Failed to fetch any data from Alpha Vantage. Likely rate limited.")
-            return {} # Return empty data to suppress further errors
-            
-        self._last_success = True # Reset on success
-        return final_data
+            history = self.history.get(symbol)
+            if history and (first_refresh or symbol in appended):
+                history_data[symbol] = history.stats()
+                updated.add(symbol)
+        return updated
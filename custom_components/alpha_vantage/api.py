@@ -0,0 +1,254 @@
+"""Client for the Alpha Vantage REST API."""
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable
+from datetime import date
+
+import aiohttp
+
+from .const import API_URL
+from .metrics import RequestMetrics
+from .models import Quote
+
+REQUEST_TIMEOUT = 10
+
+class AlphaVantageError(Exception):
+    """Error returned by the Alpha Vantage API."""
+
+
+class RateLimitError(AlphaVantageError):
+    """The request was rejected because a rate limit was reached."""
+
+
+class DailyLimitError(RateLimitError):
+    """The daily request quota of the API key is used up."""
+
+
+class InvalidApiKeyError(AlphaVantageError):
+    """The API key was rejected."""
+
+
+class PremiumEndpointError(AlphaVantageError):
+    """The API key is not entitled to a premium function."""
+
+
+def _is_daily_limit(message: str) -> bool:
+    """Return True if a rate limit reply is about the daily quota."""
+    message = message.lower()
+    # Per-minute notes may mention the daily limit as well
+    return "per day" in message and "per minute" not in message and "per second" not in message
+
+
+def _is_premium_only(message: str) -> bool:
+    """Return True if a reply says the function needs a premium plan.
+
+    Rate limit replies advertise the premium plans as well, so only explicit
+    entitlement wording counts.
+    """
+    message = message.lower()
+    return "premium endpoint" in message or "premium feature" in message
+
+
+async def _async_read_csv(header: bytes, content: aiohttp.StreamReader, on_row: Callable[[dict], None]) -> float:
+    """Hand the rows of a CSV body to on_row line by line.
+
+    Returns the time spent decoding. Alpha Vantage CSV fields are numbers,
+    dates and symbols, so lines are split on commas without quote handling.
+    """
+    started = time.monotonic()
+    names = header.decode().strip().split(",")
+    decode_time = time.monotonic() - started
+    async for line in content:
+        started = time.monotonic()
+        line = line.decode().strip()
+        if line:
+            try:
+                on_row(dict(zip(names, line.split(","))))
+            except (KeyError, ValueError) as err:
+                raise AlphaVantageError(f"Invalid CSV response: {err}") from err
+        decode_time += time.monotonic() - started
+    return decode_time
+
+
+class AlphaVantageClient:
+    """Thin wrapper around the Alpha Vantage query endpoint."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        bulk: bool = False,
+        metrics: RequestMetrics | None = None,
+        full_history: bool = True,
+    ) -> None:
+        """Initialize the client."""
+        self.session = session
+        self.api_key = api_key
+        self.metrics = metrics or RequestMetrics()
+        # Cleared once the API reports that the key has no access to these
+        self.bulk_supported = bulk
+        self.full_history_supported = full_history
+
+    async def _async_request(self, params: dict, on_row: Callable[[dict], None] | None = None) -> dict | None:
+        """Run a query and raise on error responses.
+
+        With on_row the query asks for datatype=csv and hands every row to
+        on_row as it arrives, so large responses are never held in memory
+        as a whole; None is returned then. Notes and errors still come back
+        as JSON and are handled like any JSON reply, which is returned.
+        """
+        function = params["function"]
+        params = {**params, "apikey": self.api_key}
+        if on_row is not None:
+            params["datatype"] = "csv"
+        start = time.monotonic()
+        decode_time = 0.0
+        async with self.session.get(API_URL, params=params, timeout=REQUEST_TIMEOUT) as response:
+            if response.status != 200:
+                raise AlphaVantageError(f"HTTP status {response.status}")
+            if on_row is None:
+                body = await response.read()
+            else:
+                header = await response.content.readline()
+                if header.lstrip().startswith(b"{"):
+                    body = header + await response.content.read()
+                else:
+                    decode_time = await _async_read_csv(header, response.content, on_row)
+                    body = None
+        decode_start = time.monotonic()
+        # CSV rows are decoded while the body streams in
+        self.metrics.observe_request(function, decode_start - start - decode_time)
+        if body is None:
+            self.metrics.observe_decode(decode_time)
+            return None
+        try:
+            data = json.loads(body)
+        except ValueError as err:
+            raise AlphaVantageError(f"Invalid response: {err}") from err
+        self.metrics.observe_decode(time.monotonic() - decode_start)
+
+        for key in ("Note", "Information"):
+            if key not in data:
+                continue
+            message = data[key]
+            # Daily limit replies also advertise the premium plans, check them first
+            if _is_daily_limit(message):
+                raise DailyLimitError(message)
+            # "Information" is used both for rate limits and for premium-only functions
+            if key == "Information" and _is_premium_only(message):
+                raise PremiumEndpointError(message)
+            raise RateLimitError(message)
+        if "Error Message" in data:
+            msg = data["Error Message"]
+            if "the apikey parameter" in msg.lower():
+                raise InvalidApiKeyError(msg)
+            raise AlphaVantageError(msg)
+        return data
+
+    async def async_get_quote(self, symbol: str) -> Quote | None:
+        """Return the GLOBAL_QUOTE of a symbol, or None if it is unknown."""
+        data = await self._async_request({"function": "GLOBAL_QUOTE", "symbol": symbol})
+        if not data.get("Global Quote"):
+            return None
+        return Quote.from_global_quote(data["Global Quote"])
+
+    async def async_get_exchange_rate(self, pair: str) -> Quote | None:
+        """Return the CURRENCY_EXCHANGE_RATE of a pair such as EUR/USD or BTC/EUR.
+
+        The rate is returned as the price of a quote of the pair, or None if
+        the pair is unknown. Physical and digital currencies are both supported.
+        """
+        from_currency, _, to_currency = pair.partition("/")
+        data = await self._async_request(
+            {
+                "function": "CURRENCY_EXCHANGE_RATE",
+                "from_currency": from_currency,
+                "to_currency": to_currency,
+            }
+        )
+        if not data.get("Realtime Currency Exchange Rate"):
+            return None
+        return Quote.from_exchange_rate(data["Realtime Currency Exchange Rate"])
+
+    async def async_get_bulk_quotes(self, symbols: list[str]) -> dict[str, Quote]:
+        """Return quotes for up to 100 symbols from a single REALTIME_BULK_QUOTES call.
+
+        Symbols missing from the response are left out.
+        """
+        quotes = {}
+
+        def add(row: dict) -> None:
+            quote = Quote.from_bulk_quote(row)
+            if quote.symbol:
+                quotes[quote.symbol] = quote
+
+        try:
+            data = await self._async_request(
+                {"function": "REALTIME_BULK_QUOTES", "symbol": ",".join(symbols)}, add
+            )
+        except PremiumEndpointError:
+            self.bulk_supported = False
+            raise
+        if data is None:
+            return quotes
+        if "data" not in data:
+            # The demo response reports missing entitlement in "message"
+            message = data.get("message", "")
+            if _is_premium_only(message):
+                self.bulk_supported = False
+                raise PremiumEndpointError(message)
+            raise AlphaVantageError(f"Unexpected bulk quote response: {message or data}")
+        for item in data["data"]:
+            add(item)
+        return quotes
+
+    async def async_get_daily_history(self, symbol: str, full: bool = False) -> list[tuple]:
+        """Return daily bars (date, open, high, low, close, volume), oldest first.
+
+        outputsize=full returns the complete history and is a premium feature,
+        compact returns the latest 100 bars.
+        """
+        bars = []
+
+        def add(row: dict) -> None:
+            bars.append(
+                (
+                    date.fromisoformat(row["timestamp"]),
+                    float(row["open"]),
+                    float(row["high"]),
+                    float(row["low"]),
+                    float(row["close"]),
+                    float(row["volume"]),
+                )
+            )
+
+        try:
+            data = await self._async_request(
+                {
+                    "function": "TIME_SERIES_DAILY",
+                    "symbol": symbol,
+                    "outputsize": "full" if full else "compact",
+                },
+                add,
+            )
+        except PremiumEndpointError:
+            if full:
+                self.full_history_supported = False
+            raise
+
+        if data is not None:
+            for day, values in data.get("Time Series (Daily)", {}).items():
+                add(
+                    {
+                        "timestamp": day,
+                        "open": values["1. open"],
+                        "high": values["2. high"],
+                        "low": values["3. low"],
+                        "close": values["4. close"],
+                        "volume": values["5. volume"],
+                    }
+                )
+        bars.sort()
+        return bars
@@ -0,0 +1,78 @@
+"""Circuit breaker pausing requests of an API key until its daily quota resets."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from .budget import seconds_until_reset
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops all requests of an API key once the provider reports its daily limit.
+
+    The breaker opens on a daily limit reply and stays open until the quota
+    resets at midnight UTC. It then lets a single probe request through: a
+    successful probe closes it, another daily limit reply opens it again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a closed breaker."""
+        self._state = STATE_CLOSED
+        self.reset_at: datetime | None = None
+        self.opened = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Return the breaker state, half-open once the quota has reset."""
+        if self._state == STATE_OPEN and datetime.now(timezone.utc) >= self.reset_at:
+            self._state = STATE_HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent, reserving the probe when half-open."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        if self._state != STATE_CLOSED:
+            _LOGGER.info("Alpha Vantage daily quota is available again, resuming requests")
+        self._state = STATE_CLOSED
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Release the probe after a request that failed for another reason."""
+        self._probing = False
+
+    def record_daily_limit(self) -> None:
+        """Open the breaker until the daily quota resets."""
+        now = datetime.now(timezone.utc)
+        self.reset_at = now + timedelta(seconds=seconds_until_reset(now))
+        if self._state != STATE_OPEN:
+            _LOGGER.warning(
+                "Alpha Vantage daily request limit reached, pausing requests until %s",
+                self.reset_at.isoformat(),
+            )
+            self.opened += 1
+        self._state = STATE_OPEN
+        self._probing = False
+
+    def as_dict(self) -> dict:
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state,
+            "reset_at": self.reset_at.isoformat() if self.reset_at else None,
+            "opened": self.opened,
+        }
@@ -0,0 +1,223 @@
+"""Request budget scheduling shared across Alpha Vantage config entries."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    API_TIERS,
+    DATA_BUDGETS,
+    DEFAULT_TIER,
+    BUDGET_STORAGE_KEY,
+)
+from .store import SharedStore
+
+_LOGGER = logging.getLogger(__name__)
+
+SAVE_DELAY = 10
+
+
+def api_key_id(api_key: str) -> str:
+    """Return a stable, non-reversible identifier for an API key."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+def _utc_day(now: datetime | None = None) -> str:
+    """Return the current quota day (the daily quota resets at midnight UTC)."""
+    now = now or datetime.now(timezone.utc)
+    return now.date().isoformat()
+
+
+def seconds_until_reset(now: datetime | None = None) -> float:
+    """Return the number of seconds until the daily quota resets."""
+    now = now or datetime.now(timezone.utc)
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+    return (midnight - now).total_seconds()
+
+
+class TokenBucket:
+    """Token bucket that refills continuously at capacity tokens per period."""
+
+    def __init__(self, capacity: int, period: float) -> None:
+        """Initialize a full bucket."""
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        rate = self.capacity / self.period
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def time_until_available(self) -> float:
+        """Return seconds until one token is available."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.period / self.capacity
+
+    def available(self) -> int:
+        """Return the number of whole tokens in the bucket."""
+        self._refill()
+        return max(int(self.tokens), 0)
+
+    def consume(self) -> None:
+        """Take one token from the bucket."""
+        self._refill()
+        self.tokens -= 1
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the provider reported a rate limit."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RequestBudget:
+    """Per-minute and per-day request budget for one API key."""
+
+    def __init__(self, manager: BudgetManager, key_id: str, tier: str) -> None:
+        """Initialize the budget."""
+        self._manager = manager
+        self.key_id = key_id
+        self._lock = asyncio.Lock()
+        self.tier = None
+        self.per_day = None
+        self.minute = None
+        self.day = _utc_day()
+        self.used_today = 0
+        self.set_tier(tier)
+
+    def set_tier(self, tier: str) -> None:
+        """Apply the request limits of an Alpha Vantage plan."""
+        if tier not in API_TIERS:
+            tier = DEFAULT_TIER
+        if tier == self.tier:
+            return
+        limits = API_TIERS[tier]
+        self.tier = tier
+        self.per_day = limits["per_day"]
+        self.minute = TokenBucket(limits["per_minute"], 60)
+
+    def _roll_day(self) -> None:
+        day = _utc_day()
+        if day != self.day:
+            self.day = day
+            self.used_today = 0
+            self._manager.async_schedule_save()
+
+    @property
+    def remaining_today(self) -> int | None:
+        """Return requests left today, or None when there is no daily limit."""
+        self._roll_day()
+        if self.per_day is None:
+            return None
+        return max(self.per_day - self.used_today, 0)
+
+    @property
+    def remaining_this_minute(self) -> int:
+        """Return requests that can be made right away without waiting."""
+        return self.minute.available()
+
+    def request_rate(self) -> float | None:
+        """Return requests per second that can be spent evenly until the daily reset."""
+        remaining = self.remaining_today
+        if remaining is None:
+            return None
+        return remaining / max(seconds_until_reset(), 1)
+
+    def requests_for_cycle(self, interval: timedelta) -> int | None:
+        """Return how many requests one update cycle may use.
+
+        The remaining daily quota is divided evenly over the update cycles
+        left until the quota resets, so the budget lasts all day.
+        """
+        remaining = self.remaining_today
+        if remaining is None:
+            return None
+        cycles_left = max(math.ceil(seconds_until_reset() / interval.total_seconds()), 1)
+        return math.ceil(remaining / cycles_left)
+
+    async def async_acquire(self, max_wait: float) -> bool:
+        """Wait for a request slot, returning False if none frees up in time."""
+        async with self._lock:
+            remaining = self.remaining_today
+            if remaining is not None and remaining <= 0:
+                return False
+            wait = self.minute.time_until_available()
+            if wait > max_wait:
+                return False
+            if wait > 0:
+                _LOGGER.debug("Waiting %.1fs for a request slot", wait)
+                await asyncio.sleep(wait)
+            self.minute.consume()
+            self.used_today += 1
+            self._manager.async_schedule_save()
+            return True
+
+    def note_rate_limited(self) -> None:
+        """Record that the provider rejected a request for rate limiting."""
+        self.minute.drain()
+
+    def as_dict(self) -> dict:
+        """Return the budget state for diagnostics."""
+        return {
+            "tier": self.tier,
+            "day": self.day,
+            "used_today": self.used_today,
+            "remaining_today": self.remaining_today,
+            "remaining_minute": self.remaining_this_minute,
+        }
+
+
+class BudgetManager(SharedStore):
+    """Holds the request budgets of all API keys and persists daily counters."""
+
+    STORAGE_KEY = BUDGET_STORAGE_KEY
+    DATA_KEY = DATA_BUDGETS
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the manager."""
+        super().__init__(hass)
+        self._budgets: dict[str, RequestBudget] = {}
+        self._stored: dict = {}
+
+    def _restore(self, stored: dict) -> None:
+        self._stored = stored
+
+    def get(self, api_key: str, tier: str) -> RequestBudget:
+        """Return the budget of an API key, creating it if needed."""
+        key_id = api_key_id(api_key)
+        budget = self._budgets.get(key_id)
+        if budget is None:
+            budget = RequestBudget(self, key_id, tier)
+            stored = self._stored.get(key_id)
+            if stored and stored.get("day") == budget.day:
+                budget.used_today = stored.get("used", 0)
+            self._budgets[key_id] = budget
+        else:
+            budget.set_tier(tier)
+        return budget
+
+    def async_schedule_save(self) -> None:
+        """Persist the daily counters after a short delay."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        return {
+            key_id: {"day": budget.day, "used": budget.used_today}
+            for key_id, budget in self._budgets.items()
+        }
+
+
+async def async_get_budget(hass: HomeAssistant, api_key: str, tier: str) -> RequestBudget:
+    """Return the shared request budget for an API key."""
+    manager = await BudgetManager.async_get(hass)
+    return manager.get(api_key, tier)
@@ -0,0 +1,78 @@
+"""Persistent quote cache for the Alpha Vantage integration."""
+from __future__ import annotations
+
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_QUOTE_CACHE,
+    QUOTE_CACHE_STORAGE_KEY,
+)
+from .models import Quote
+from .store import SharedStore
+
+SAVE_DELAY = 30
+
+
+class QuoteCache(SharedStore):
+    """Last fetched quote per symbol, persisted across restarts."""
+
+    STORAGE_KEY = QUOTE_CACHE_STORAGE_KEY
+    DATA_KEY = DATA_QUOTE_CACHE
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        super().__init__(hass)
+        self._entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _restore(self, stored: dict) -> None:
+        self._entries = {
+            symbol: {"fetched": entry["fetched"], "quote": Quote.from_dict(entry["quote"])}
+            for symbol, entry in stored.items()
+        }
+
+    def fetched_at(self, symbol: str) -> float:
+        """Return the epoch time a symbol was last fetched, or 0 if never."""
+        entry = self._entries.get(symbol)
+        return entry["fetched"] if entry else 0
+
+    def get(self, symbol: str) -> Quote | None:
+        """Return the cached quote of a symbol regardless of its age."""
+        entry = self._entries.get(symbol)
+        return entry["quote"] if entry else None
+
+    def get_fresh(self, symbol: str, ttl: float) -> Quote | None:
+        """Return the cached quote if it is younger than ttl seconds."""
+        entry = self._entries.get(symbol)
+        if entry and time.time() - entry["fetched"] < ttl:
+            self.hits += 1
+            return entry["quote"]
+        self.misses += 1
+        return None
+
+    def set(self, symbol: str, quote: Quote) -> None:
+        """Store a freshly fetched quote."""
+        self._entries[symbol] = {"fetched": time.time(), "quote": quote}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        return {
+            symbol: {"fetched": entry["fetched"], "quote": entry["quote"].as_dict()}
+            for symbol, entry in self._entries.items()
+        }
+
+    def as_dict(self) -> dict:
+        """Return cache statistics for diagnostics."""
+        return {
+            "symbols": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+async def async_get_quote_cache(hass: HomeAssistant) -> QuoteCache:
+    """Return the quote cache shared by all config entries."""
+    return await QuoteCache.async_get(hass)
@@ -0,0 +1,82 @@
+"""Change detection for Alpha Vantage quotes."""
+from __future__ import annotations
+
+from .const import SENSOR_TYPES
+from .fx import CURRENCY_ATTRIBUTES
+from .models import HistoryStats, Quote
+
+
+def quote_value(
+    quote: Quote | HistoryStats, attribute: str, decimals: int, rate: float | None = 1.0
+) -> float | None:
+    """Return a quote or history field rounded to the configured decimals.
+
+    Amounts of money are multiplied by rate; None means the rate is unknown.
+    """
+    value = getattr(quote, attribute)
+    if value is None:
+        return None
+    if attribute in CURRENCY_ATTRIBUTES:
+        if rate is None:
+            return None
+        value *= rate
+    return round(value, decimals)
+
+
+def quote_attributes(quote: Quote | HistoryStats, symbol: str) -> dict:
+    """Return the state attributes shared by all sensors of a symbol."""
+    return {
+        "last_refreshed": quote.latest_trading_day,
+        "symbol": symbol,
+    }
+
+
+class ChangeTracker:
+    """Remembers the last values per symbol and sensor type to find real changes."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self._last: dict[tuple[str, str], tuple[dict, dict]] = {}
+        # Maintained by the sensors when they handle a coordinator update
+        self.states_written = 0
+        self.states_skipped = 0
+
+    def diff(
+        self,
+        symbol: str,
+        quote: Quote | HistoryStats,
+        decimals: int,
+        category: str = "symbol",
+        stale: bool = False,
+        rate: float | None = 1.0,
+    ) -> set[str]:
+        """Return the sensor types of a category whose value or attributes changed.
+
+        stale marks a quote carried forward while its refresh is retried,
+        rate converts amounts of money into the home currency.
+        """
+        values = {
+            sensor_type: quote_value(quote, info["attribute"], decimals, rate)
+            for sensor_type, info in SENSOR_TYPES.items()
+            if info["category"] == category
+        }
+        attributes = quote_attributes(quote, symbol)
+        if stale:
+            attributes["stale"] = True
+        previous = self._last.get((category, symbol))
+        self._last[(category, symbol)] = (values, attributes)
+
+        if previous is None or previous[1] != attributes:
+            return set(values)
+        return {
+            sensor_type
+            for sensor_type, value in values.items()
+            if previous[0].get(sensor_type) != value
+        }
+
+    def as_dict(self) -> dict:
+        """Return state write counters for diagnostics."""
+        return {
+            "states_written": self.states_written,
+            "states_skipped": self.states_skipped,
+        }
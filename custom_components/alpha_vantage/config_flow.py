@@ -1,7 +1,6 @@
 """Config flow for Alpha Vantage integration."""
 import logging
 import voluptuous as vol
-import aiohttp
 
 from homeassistant import config_entries
 from homeassistant.core import callback
@@ -14,18 +13,40 @@ from .const import (
     CONF_SCAN_INTERVAL, 
     CONF_DECIMALS, 
     CONF_SHOW_SENSORS,
-    API_URL, 
+    CONF_TIER,
+    CONF_CACHE_TTL,
+    CONF_MARKET_HOURS,
+    CONF_HOLIDAYS,
+    CONF_STAGGER,
+    CONF_PRIORITIES,
+    CONF_FRESHNESS,
+    CONF_HOLDINGS,
+    CONF_HOME_CURRENCY,
+    CONF_FAST_START,
+    API_TIERS,
     DEFAULT_SCAN_INTERVAL, 
     DEFAULT_DECIMALS,
     DEFAULT_SENSORS,
+    DEFAULT_TIER,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_MARKET_HOURS,
+    DEFAULT_STAGGER,
+    DEFAULT_FAST_START,
+    PRIORITY_WEIGHTS,
     SENSOR_TYPES
 )
+from .hub import async_validate_api_key, parse_api_keys
+from .portfolio import parse_holdings
+from .scheduler import parse_symbol_settings
 
 _LOGGER = logging.getLogger(__name__)
 
 DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_API_KEY): str,
     vol.Required(CONF_SYMBOLS, default="AAPL"): str,
+    vol.Optional(CONF_TIER, default=DEFAULT_TIER): vol.In(
+        {k: v["name"] for k, v in API_TIERS.items()}
+    ),
     vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(cv.positive_int, vol.Range(min=60)),
     vol.Optional(CONF_DECIMALS, default=DEFAULT_DECIMALS): vol.All(cv.positive_int, vol.Range(min=0)),
     vol.Optional(CONF_SHOW_SENSORS, default=DEFAULT_SENSORS): cv.multi_select(
@@ -33,50 +54,106 @@ DATA_SCHEMA = vol.Schema({
     ),
 })
 
+def _mask(api_keys):
+    """Return API keys shortened to their last characters, for display."""
+    return ", ".join(f"…{api_key[-4:]}" for api_key in api_keys)
+
+
+def _replace_key(value, old, new):
+    """Replace one key of an API key option, keeping its plan."""
+    items = []
+    for item in value.split(","):
+        key, sep, tier = item.strip().partition(":")
+        items.append(f"{new}{sep}{tier}" if key.strip() == old else item.strip())
+    return ", ".join(items)
+
+
+async def _async_check_api_keys(hass, value, tier, known=()):
+    """Return the error for an API key option, None if every key is accepted.
+
+    Keys in known are in use already and not validated again.
+    """
+    try:
+        api_keys = parse_api_keys(value, tier)
+    except ValueError:
+        return "invalid_api_keys"
+    for api_key in api_keys:
+        if api_key not in known and not await async_validate_api_key(hass, api_key):
+            return "invalid_auth"
+    return None
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Alpha Vantage."""
 
     VERSION = 1
+    _failed_key = None
 
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         errors = {}
         if user_input is not None:
-            # Validate the API key
-            valid = await self._test_api_key(user_input[CONF_API_KEY])
-            if valid:
+            # Validate every API key of the pool
+            error = await _async_check_api_keys(
+                self.hass, user_input[CONF_API_KEY], user_input.get(CONF_TIER, DEFAULT_TIER)
+            )
+            if error is None:
                 return self.async_create_entry(title="Alpha Vantage", data=user_input)
-            else:
-                errors["base"] = "invalid_auth"
+            errors["base"] = error
 
         return self.async_show_form(
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
         )
 
-    async def async_step_reauth(self, user_input=None):
+    async def async_step_reauth(self, entry_data=None):
         """Handle re-authentication."""
+        # Set when only one key of a pool was rejected
+        self._failed_key = (entry_data or {}).get("failed_key")
         return await self.async_step_reauth_confirm()
 
     async def async_step_reauth_confirm(self, user_input=None):
-        """Handle re-authentication confirmation."""
+        """Handle re-authentication confirmation.
+
+        Replaces the rejected key of a pool, or the whole API key option
+        when no key of the entry is accepted any more.
+        """
         errors = {}
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        current = entry.options.get(CONF_API_KEY, entry.data[CONF_API_KEY])
         if user_input is not None:
-            valid = await self._test_api_key(user_input[CONF_API_KEY])
-            if valid:
-                entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
-                self.hass.config_entries.async_update_entry(
-                    entry, data={**entry.data, CONF_API_KEY: user_input[CONF_API_KEY]}
+            api_key = user_input[CONF_API_KEY]
+            if self._failed_key:
+                api_key = api_key.strip()
+                error = None if await self._test_api_key(api_key) else "invalid_auth"
+                api_key = _replace_key(current, self._failed_key, api_key)
+            else:
+                error = await _async_check_api_keys(
+                    self.hass, api_key, entry.options.get(CONF_TIER, entry.data.get(CONF_TIER, DEFAULT_TIER))
                 )
+            if error is None:
+                # The options hold the key once they were saved
+                if CONF_API_KEY in entry.options:
+                    self.hass.config_entries.async_update_entry(
+                        entry, options={**entry.options, CONF_API_KEY: api_key}
+                    )
+                else:
+                    self.hass.config_entries.async_update_entry(
+                        entry, data={**entry.data, CONF_API_KEY: api_key}
+                    )
                 await self.hass.config_entries.async_reload(entry.entry_id)
                 return self.async_abort(reason="reauth_successful")
-            else:
-                errors["base"] = "invalid_auth"
+            errors["base"] = error
 
+        try:
+            rejected = [self._failed_key] if self._failed_key else list(parse_api_keys(current))
+        except ValueError:
+            rejected = []
         return self.async_show_form(
             step_id="reauth_confirm",
             data_schema=vol.Schema({
                 vol.Required(CONF_API_KEY): str,
             }),
+            description_placeholders={"key": _mask(rejected)},
             errors=errors,
         )
 
@@ -88,24 +165,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def _test_api_key(self, api_key):
         """Test if the API key is valid."""
-        params = {
-            "function": "GLOBAL_QUOTE",
-            "symbol": "AAPL",
-            "apikey": api_key
-        }
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(API_URL, params=params) as response:
-                    if response.status != 200:
-                        return False
-                    data = await response.json()
-                    # If it's a Note (rate limit) or a Global Quote, the key is valid structure-wise
-                    # If it has an Error Message about API Key, it's invalid
-                    if "Error Message" in data and "the apikey parameter" in data["Error Message"].lower():
-                        return False
-                    return True
-            except Exception:
-                return False
+        return await async_validate_api_key(self.hass, api_key)
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
     """Handle options flow for Alpha Vantage."""
@@ -113,11 +173,29 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         """Initialize options flow."""
         self._config_entry = config_entry
+        self._options = {}
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            current = self._config_entry.options.get(CONF_API_KEY, self._config_entry.data.get(CONF_API_KEY))
+            home_currency = user_input.get(CONF_HOME_CURRENCY, "").strip().upper()
+            if home_currency and not (home_currency.isalnum() and 3 <= len(home_currency) <= 10):
+                errors[CONF_HOME_CURRENCY] = "invalid_currency"
+            else:
+                # Only added keys need to be validated
+                try:
+                    known = parse_api_keys(current)
+                except ValueError:
+                    known = {}
+                error = await _async_check_api_keys(
+                    self.hass, user_input[CONF_API_KEY], user_input.get(CONF_TIER, DEFAULT_TIER), known
+                )
+                if error is None:
+                    self._options = {**user_input, CONF_HOME_CURRENCY: home_currency}
+                    return await self.async_step_symbols()
+                errors["base"] = error
 
         return self.async_show_form(
             step_id="init",
@@ -136,6 +214,13 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         self._config_entry.data.get(CONF_SYMBOLS, "AAPL,MSFT")
                     ),
                 ): str,
+                vol.Optional(
+                    CONF_TIER,
+                    default=self._config_entry.options.get(
+                        CONF_TIER,
+                        self._config_entry.data.get(CONF_TIER, DEFAULT_TIER)
+                    ),
+                ): vol.In({k: v["name"] for k, v in API_TIERS.items()}),
                 vol.Optional(
                     CONF_SCAN_INTERVAL,
                     default=self._config_entry.options.get(
@@ -143,6 +228,48 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         self._config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
                     ),
                 ): vol.All(cv.positive_int, vol.Range(min=60)),
+                vol.Optional(
+                    CONF_CACHE_TTL,
+                    default=self._config_entry.options.get(
+                        CONF_CACHE_TTL,
+                        self._config_entry.data.get(CONF_CACHE_TTL, DEFAULT_CACHE_TTL)
+                    ),
+                ): vol.All(cv.positive_int, vol.Range(min=0)),
+                vol.Optional(
+                    CONF_MARKET_HOURS,
+                    default=self._config_entry.options.get(
+                        CONF_MARKET_HOURS,
+                        self._config_entry.data.get(CONF_MARKET_HOURS, DEFAULT_MARKET_HOURS)
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_HOLIDAYS,
+                    default=self._config_entry.options.get(
+                        CONF_HOLIDAYS,
+                        self._config_entry.data.get(CONF_HOLIDAYS, "")
+                    ),
+                ): str,
+                vol.Optional(
+                    CONF_STAGGER,
+                    default=self._config_entry.options.get(
+                        CONF_STAGGER,
+                        self._config_entry.data.get(CONF_STAGGER, DEFAULT_STAGGER)
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_FAST_START,
+                    default=self._config_entry.options.get(
+                        CONF_FAST_START,
+                        self._config_entry.data.get(CONF_FAST_START, DEFAULT_FAST_START)
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_HOME_CURRENCY,
+                    default=self._config_entry.options.get(
+                        CONF_HOME_CURRENCY,
+                        self._config_entry.data.get(CONF_HOME_CURRENCY, "")
+                    ),
+                ): str,
                 vol.Optional(
                     CONF_DECIMALS,
                     default=self._config_entry.options.get(
@@ -158,4 +285,56 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     ),
                 ): cv.multi_select({k: v["name"] for k, v in SENSOR_TYPES.items()}),
             }),
+            errors=errors,
+        )
+
+    async def async_step_symbols(self, user_input=None):
+        """Manage per-symbol priorities, target freshness and holdings."""
+        errors = {}
+        if user_input is not None:
+            try:
+                priorities = parse_symbol_settings(user_input.get(CONF_PRIORITIES, ""))
+                if any(value not in PRIORITY_WEIGHTS for value in priorities.values()):
+                    raise ValueError
+            except ValueError:
+                errors[CONF_PRIORITIES] = "invalid_priorities"
+            try:
+                freshness = parse_symbol_settings(user_input.get(CONF_FRESHNESS, ""))
+                if any(int(value) < 60 for value in freshness.values()):
+                    raise ValueError
+            except ValueError:
+                errors[CONF_FRESHNESS] = "invalid_freshness"
+            try:
+                parse_holdings(user_input.get(CONF_HOLDINGS, ""))
+            except ValueError:
+                errors[CONF_HOLDINGS] = "invalid_holdings"
+            if not errors:
+                return self.async_create_entry(title="", data={**self._options, **user_input})
+
+        return self.async_show_form(
+            step_id="symbols",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_PRIORITIES,
+                    default=self._config_entry.options.get(
+                        CONF_PRIORITIES,
+                        self._config_entry.data.get(CONF_PRIORITIES, "")
+                    ),
+                ): str,
+                vol.Optional(
+                    CONF_FRESHNESS,
+                    default=self._config_entry.options.get(
+                        CONF_FRESHNESS,
+                        self._config_entry.data.get(CONF_FRESHNESS, "")
+                    ),
+                ): str,
+                vol.Optional(
+                    CONF_HOLDINGS,
+                    default=self._config_entry.options.get(
+                        CONF_HOLDINGS,
+                        self._config_entry.data.get(CONF_HOLDINGS, "")
+                    ),
+                ): str,
+            }),
+            errors=errors,
         )
@@ -1,4 +1,5 @@
 """Constants for the Alpha Vantage integration."""
+from datetime import timedelta
 
 DOMAIN = "alpha_vantage"
 
@@ -7,33 +8,85 @@ CONF_SYMBOLS = "symbols"
 CONF_SCAN_INTERVAL = "scan_interval"
 CONF_DECIMALS = "decimals"
 CONF_SHOW_SENSORS = "show_sensors"
+CONF_TIER = "tier"
+CONF_CACHE_TTL = "cache_ttl"
+CONF_MARKET_HOURS = "market_hours"
+CONF_HOLIDAYS = "holidays"
+CONF_STAGGER = "stagger"
+CONF_PRIORITIES = "priorities"
+CONF_FRESHNESS = "freshness"
+CONF_HOLDINGS = "holdings"
+CONF_HOME_CURRENCY = "home_currency"
+CONF_FAST_START = "fast_start"
 
 DEFAULT_SCAN_INTERVAL = 3600  # 1 hour (to stay within 25 req/day limit)
 DEFAULT_DECIMALS = 2
 DEFAULT_SENSORS = ["price", "change", "change_percent"]
+DEFAULT_TIER = "free"
+DEFAULT_CACHE_TTL = 3600  # Cached quotes younger than this are not fetched again
+DEFAULT_MARKET_HOURS = True  # Only poll symbols while their exchange trades
+DEFAULT_STAGGER = False  # Spread symbol refreshes over the scan interval
+DEFAULT_FAST_START = True  # Set up entities from the cache and fetch in the background
+MIN_POLL_INTERVAL = timedelta(seconds=60)
+MAX_REFRESH_PERIOD = timedelta(days=1)
+
+# Share of the request budget per symbol priority
+PRIORITY_WEIGHTS = {"high": 4, "normal": 2, "low": 1}
+DEFAULT_PRIORITY = "normal"
+
+# Keys in hass.data[DOMAIN] that are shared across config entries
+DATA_BUDGETS = "budgets"
+DATA_QUOTE_CACHE = "quote_cache"
+DATA_HISTORY = "history"
+DATA_HUBS = "hubs"
+DATA_KEY_VALIDATIONS = "key_validations"
+
+STORAGE_VERSION = 1
+BUDGET_STORAGE_KEY = f"{DOMAIN}.budget"
+QUOTE_CACHE_STORAGE_KEY = f"{DOMAIN}.quotes"
+HISTORY_STORAGE_KEY = f"{DOMAIN}.history"
+
+# Request limits per Alpha Vantage plan (None = no daily limit) and whether
+# the plan can use REALTIME_BULK_QUOTES and the full TIME_SERIES_DAILY history.
+# The daily quota resets at midnight UTC.
+API_TIERS = {
+    "free": {"name": "Free (5/min, 25/day)", "per_minute": 5, "per_day": 25, "bulk": False, "full_history": False},
+    "premium_75": {"name": "Premium (75/min)", "per_minute": 75, "per_day": None, "bulk": True, "full_history": True},
+    "premium_150": {"name": "Premium (150/min)", "per_minute": 150, "per_day": None, "bulk": True, "full_history": True},
+    "premium_300": {"name": "Premium (300/min)", "per_minute": 300, "per_day": None, "bulk": True, "full_history": True},
+    "premium_600": {"name": "Premium (600/min)", "per_minute": 600, "per_day": None, "bulk": True, "full_history": True},
+    "premium_1200": {"name": "Premium (1200/min)", "per_minute": 1200, "per_day": None, "bulk": True, "full_history": True},
+}
 
 # API Endpoints
 # Alpha Vantage uses a single endpoint with different 'function' parameters
 API_URL = "https://www.alphavantage.co/query"
+BULK_QUOTE_LIMIT = 100  # Symbols per REALTIME_BULK_QUOTES request
 
+# "currency" marks amounts of money, converted when a home currency is set
 SENSOR_TYPES = {
     "price": {
+        "attribute": "price",
         "name": "Price",
         "json_path": ["05. price"],
         "unit": None,  # Will be set in sensor.py if needed
         "icon": "mdi:currency-usd",
         "category": "symbol",
+        "currency": True,
         "state_class": "measurement",
     },
     "change": {
+        "attribute": "change",
         "name": "Change",
         "json_path": ["09. change"],
         "unit": None,
         "icon": "mdi:trending-up",
         "category": "symbol",
+        "currency": True,
         "state_class": "measurement",
     },
     "change_percent": {
+        "attribute": "change_percent",
         "name": "Change Percent",
         "json_path": ["10. change percent"],
         "unit": "%",
@@ -42,6 +95,7 @@ SENSOR_TYPES = {
         "state_class": "measurement",
     },
     "volume": {
+        "attribute": "volume",
         "name": "Volume",
         "json_path": ["06. volume"],
         "unit": None,
@@ -50,27 +104,280 @@ SENSOR_TYPES = {
         "state_class": "measurement",
     },
     "high": {
+        "attribute": "high",
         "name": "High",
         "json_path": ["03. high"],
         "unit": None,
         "icon": "mdi:arrow-up-bold",
         "category": "symbol",
+        "currency": True,
         "state_class": "measurement",
     },
     "low": {
+        "attribute": "low",
         "name": "Low",
         "json_path": ["04. low"],
         "unit": None,
         "icon": "mdi:arrow-down-bold",
         "category": "symbol",
+        "currency": True,
         "state_class": "measurement",
     },
     "previous_close": {
+        "attribute": "previous_close",
         "name": "Previous Close",
         "json_path": ["08. previous close"],
         "unit": None,
         "icon": "mdi:history",
         "category": "symbol",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "sma_50": {
+        "attribute": "sma_50",
+        "name": "50-Day Average",
+        "unit": None,
+        "icon": "mdi:chart-bell-curve-cumulative",
+        "category": "history",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "sma_200": {
+        "attribute": "sma_200",
+        "name": "200-Day Average",
+        "unit": None,
+        "icon": "mdi:chart-bell-curve-cumulative",
+        "category": "history",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "high_52w": {
+        "attribute": "high_52w",
+        "name": "52-Week High",
+        "unit": None,
+        "icon": "mdi:arrow-collapse-up",
+        "category": "history",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "low_52w": {
+        "attribute": "low_52w",
+        "name": "52-Week Low",
+        "unit": None,
+        "icon": "mdi:arrow-collapse-down",
+        "category": "history",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "return_1m": {
+        "attribute": "return_1m",
+        "name": "1-Month Return",
+        "unit": "%",
+        "icon": "mdi:chart-line",
+        "category": "history",
+        "state_class": "measurement",
+    },
+    "return_1y": {
+        "attribute": "return_1y",
+        "name": "1-Year Return",
+        "unit": "%",
+        "icon": "mdi:chart-line",
+        "category": "history",
+        "state_class": "measurement",
+    },
+    "sma_20": {
+        "attribute": "sma_20",
+        "name": "20-Day Average",
+        "unit": None,
+        "icon": "mdi:chart-bell-curve-cumulative",
+        "category": "indicators",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "ema_20": {
+        "attribute": "ema_20",
+        "name": "20-Day Exponential Average",
+        "unit": None,
+        "icon": "mdi:chart-bell-curve-cumulative",
+        "category": "indicators",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "rsi_14": {
+        "attribute": "rsi_14",
+        "name": "RSI (14)",
+        "unit": None,
+        "icon": "mdi:speedometer",
+        "category": "indicators",
+        "state_class": "measurement",
+    },
+    "macd": {
+        "attribute": "macd",
+        "name": "MACD",
+        "unit": None,
+        "icon": "mdi:chart-timeline-variant",
+        "category": "indicators",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "macd_signal": {
+        "attribute": "macd_signal",
+        "name": "MACD Signal",
+        "unit": None,
+        "icon": "mdi:chart-timeline-variant",
+        "category": "indicators",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "bollinger_upper": {
+        "attribute": "bollinger_upper",
+        "name": "Bollinger Upper Band",
+        "unit": None,
+        "icon": "mdi:arrow-expand-up",
+        "category": "indicators",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "bollinger_lower": {
+        "attribute": "bollinger_lower",
+        "name": "Bollinger Lower Band",
+        "unit": None,
+        "icon": "mdi:arrow-expand-down",
+        "category": "indicators",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "volatility": {
+        "attribute": "volatility",
+        "name": "Volatility (20-Day, Annualized)",
+        "unit": "%",
+        "icon": "mdi:pulse",
+        "category": "indicators",
         "state_class": "measurement",
     },
+    "drawdown": {
+        "attribute": "drawdown",
+        "name": "Drawdown",
+        "unit": "%",
+        "icon": "mdi:trending-down",
+        "category": "indicators",
+        "state_class": "measurement",
+    },
+    "portfolio_value": {
+        "attribute": "value",
+        "name": "Portfolio Value",
+        "unit": None,
+        "icon": "mdi:briefcase-outline",
+        "category": "portfolio",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "portfolio_day_change": {
+        "attribute": "day_change",
+        "name": "Portfolio Day Change",
+        "unit": None,
+        "icon": "mdi:swap-vertical",
+        "category": "portfolio",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "portfolio_day_change_percent": {
+        "attribute": "day_change_percent",
+        "name": "Portfolio Day Change Percent",
+        "unit": "%",
+        "icon": "mdi:percent",
+        "category": "portfolio",
+        "state_class": "measurement",
+    },
+    "portfolio_cost": {
+        "attribute": "cost",
+        "name": "Portfolio Cost Basis",
+        "unit": None,
+        "icon": "mdi:cash",
+        "category": "portfolio",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "portfolio_unrealized_pl": {
+        "attribute": "unrealized_pl",
+        "name": "Portfolio Unrealized P&L",
+        "unit": None,
+        "icon": "mdi:chart-line",
+        "category": "portfolio",
+        "currency": True,
+        "state_class": "measurement",
+    },
+    "portfolio_unrealized_pl_percent": {
+        "attribute": "unrealized_pl_percent",
+        "name": "Portfolio Unrealized P&L Percent",
+        "unit": "%",
+        "icon": "mdi:percent",
+        "category": "portfolio",
+        "state_class": "measurement",
+    },
+}
+
+# Per-entry sensors describing the requests made with the API key
+DIAGNOSTIC_SENSOR_TYPES = {
+    "refresh_duration": {
+        "name": "Refresh Duration",
+        "unit": "s",
+        "icon": "mdi:timer-outline",
+        "state_class": "measurement",
+    },
+    "refresh_requests": {
+        "name": "Requests per Refresh",
+        "unit": None,
+        "icon": "mdi:swap-vertical",
+        "state_class": "measurement",
+    },
+    "request_latency": {
+        "name": "Request Latency",
+        "unit": "ms",
+        "icon": "mdi:timer-sand",
+        "state_class": "measurement",
+    },
+    "decode_time": {
+        "name": "Response Decode Time",
+        "unit": "ms",
+        "icon": "mdi:code-json",
+        "state_class": "measurement",
+    },
+    "rate_limit_wait": {
+        "name": "Rate Limit Wait",
+        "unit": "s",
+        "icon": "mdi:timer-pause-outline",
+        "state_class": "total_increasing",
+    },
+    "requests_remaining_minute": {
+        "name": "Requests Remaining This Minute",
+        "unit": None,
+        "icon": "mdi:gauge",
+        "state_class": "measurement",
+    },
+    "requests_remaining_today": {
+        "name": "Requests Remaining Today",
+        "unit": None,
+        "icon": "mdi:gauge",
+        "state_class": "measurement",
+    },
+    "request_failures": {
+        "name": "Request Failures",
+        "unit": None,
+        "icon": "mdi:alert-circle-outline",
+        "state_class": "total_increasing",
+    },
+    "planned_freshness": {
+        "name": "Planned Freshness",
+        "unit": "s",
+        "icon": "mdi:calendar-clock",
+        "state_class": "measurement",
+    },
+    "request_breaker": {
+        "name": "Request Circuit Breaker",
+        "unit": None,
+        "icon": "mdi:electric-switch",
+        "state_class": None,
+        "enabled": True,  # Shows when requests are paused for the daily limit
+    },
 }
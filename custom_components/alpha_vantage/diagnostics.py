@@ -7,9 +7,9 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.components.diagnostics import async_redact_data
 
-from .const import DOMAIN, CONF_API_KEY
+from .const import DOMAIN, CONF_API_KEY, CONF_HOLDINGS
 
-TO_REDACT = {CONF_API_KEY}
+TO_REDACT = {CONF_API_KEY, CONF_HOLDINGS}
 
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: ConfigEntry
@@ -19,7 +19,21 @@ async def async_get_config_entry_diagnostics(
 
     diagnostics_data = {
         "entry": async_redact_data(entry.as_dict(), TO_REDACT),
-        "data": coordinator.data,
+        "data": {
+            section: {symbol: value.as_dict() for symbol, value in values.items()}
+            for section, values in (coordinator.data or {}).items()
+        },
+        # Hub and budget per API key, by key id
+        "keys": coordinator.pool.as_dict(),
+        "requests": {
+            **coordinator.pool.metrics.as_dict(),
+            "last_refresh_duration": coordinator.refresh_duration,
+            "last_refresh_requests": coordinator.refresh_requests,
+        },
+        "cache": coordinator.cache.as_dict(),
+        "schedule": coordinator.scheduler.as_dict(),
+        "rates": coordinator.rates,
+        "state_writes": coordinator.changes.as_dict(),
     }
 
     return diagnostics_data
@@ -0,0 +1,29 @@
+"""Currency conversion for the Alpha Vantage integration."""
+from __future__ import annotations
+
+from .const import SENSOR_TYPES
+from .market_hours import exchange_for_symbol, is_currency_pair
+
+# Quote attributes holding an amount of money
+CURRENCY_ATTRIBUTES = frozenset(
+    info["attribute"] for info in SENSOR_TYPES.values() if info.get("currency")
+)
+
+# Exchanges quoting prices in a minor unit, e.g. pence on the LSE
+MINOR_UNITS = {"LSE": 100}
+
+
+def symbol_currency(symbol: str) -> str | None:
+    """Return the currency a symbol is priced in, None for currency pairs.
+
+    Currency and crypto pairs are rates themselves and are never converted.
+    """
+    if is_currency_pair(symbol):
+        return None
+    return exchange_for_symbol(symbol).currency
+
+
+def price_scale(symbol: str) -> float:
+    """Return the factor turning a quoted price into the main currency unit."""
+    return 1 / MINOR_UNITS.get(exchange_for_symbol(symbol).code, 1)
+
@@ -0,0 +1,168 @@
+"""Local daily price history for the Alpha Vantage integration."""
+from __future__ import annotations
+
+import base64
+from array import array
+from datetime import date, datetime
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_HISTORY,
+    HISTORY_STORAGE_KEY,
+)
+from .market_hours import CLOSE_SETTLE_DELAY, MarketCalendar, exchange_for_symbol
+from .models import HistoryStats
+from .store import SharedStore
+
+SAVE_DELAY = 60
+
+# Trading days per period
+DAYS_1M = 21
+DAYS_1Y = 252
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def _encode(column: array) -> str:
+    return base64.b64encode(column.tobytes()).decode()
+
+
+def _decode(typecode: str, value: str) -> array:
+    column = array(typecode)
+    column.frombytes(base64.b64decode(value))
+    return column
+
+
+class PriceHistory:
+    """Daily bars of one symbol, stored column by column in compact arrays."""
+
+    __slots__ = ("days", "open", "high", "low", "close", "volume")
+
+    def __init__(self) -> None:
+        """Initialize an empty history."""
+        self.days = array("i")  # date.toordinal() of each bar
+        for name in PRICE_COLUMNS:
+            setattr(self, name, array("d"))
+
+    def __len__(self) -> int:
+        """Return the number of bars."""
+        return len(self.days)
+
+    @property
+    def last_day(self) -> date | None:
+        """Return the date of the newest bar."""
+        return date.fromordinal(self.days[-1]) if self.days else None
+
+    def extend(self, bars: list[tuple], until: date) -> int:
+        """Append bars newer than the last stored one, up to and including until.
+
+        bars are (date, open, high, low, close, volume) tuples in ascending
+        order. Returns the number of appended bars.
+        """
+        last = self.days[-1] if self.days else 0
+        limit = until.toordinal()
+        appended = 0
+        for day, *values in bars:
+            ordinal = day.toordinal()
+            if ordinal <= last or ordinal > limit:
+                continue
+            self.days.append(ordinal)
+            for name, value in zip(PRICE_COLUMNS, values):
+                getattr(self, name).append(value)
+            last = ordinal
+            appended += 1
+        return appended
+
+    def stats(self) -> HistoryStats:
+        """Return metrics computed from the stored bars."""
+        close = self.close
+        count = len(close)
+
+        def sma(period):
+            return sum(close[-period:]) / period if count >= period else None
+
+        def change(period):
+            if count <= period or not close[-period - 1]:
+                return None
+            return (close[-1] / close[-period - 1] - 1) * 100
+
+        return HistoryStats(
+            latest_trading_day=self.last_day.isoformat() if self.days else None,
+            sma_50=sma(50),
+            sma_200=sma(200),
+            high_52w=max(self.high[-DAYS_1Y:]) if count >= DAYS_1Y else None,
+            low_52w=min(self.low[-DAYS_1Y:]) if count >= DAYS_1Y else None,
+            return_1m=change(DAYS_1M),
+            return_1y=change(DAYS_1Y),
+        )
+
+    def as_dict(self) -> dict:
+        """Return the history as base64 encoded columns for storage."""
+        return {
+            name: _encode(getattr(self, name)) for name in ("days", *PRICE_COLUMNS)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> PriceHistory:
+        """Restore a history stored with as_dict."""
+        history = cls()
+        history.days = _decode("i", data["days"])
+        for name in PRICE_COLUMNS:
+            setattr(history, name, _decode("d", data[name]))
+        return history
+
+
+class HistoryStore(SharedStore):
+    """Price histories of all symbols, persisted across restarts."""
+
+    STORAGE_KEY = HISTORY_STORAGE_KEY
+    DATA_KEY = DATA_HISTORY
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        super().__init__(hass)
+        self._histories: dict[str, PriceHistory] = {}
+        self._checked: dict[str, date] = {}  # symbol -> last session fetched for
+
+    def _restore(self, stored: dict) -> None:
+        self._histories = {
+            symbol: PriceHistory.from_dict(data) for symbol, data in stored.items()
+        }
+
+    def get(self, symbol: str) -> PriceHistory | None:
+        """Return the history of a symbol."""
+        return self._histories.get(symbol)
+
+    def is_due(self, symbol: str, calendar: MarketCalendar, now: datetime) -> bool:
+        """Return True if a completed session is missing from the history."""
+        session_day, close = calendar.last_close(exchange_for_symbol(symbol), now)
+        if self._checked.get(symbol) == session_day:
+            # Already asked for this session, e.g. an exchange holiday without a bar
+            return False
+        history = self._histories.get(symbol)
+        if history is None or not len(history):
+            return True
+        return history.last_day < session_day and now >= close + CLOSE_SETTLE_DELAY
+
+    def update(self, symbol: str, bars: list[tuple], calendar: MarketCalendar, now: datetime) -> bool:
+        """Merge fetched bars into the history of a symbol.
+
+        Bars of a session that is still running are skipped, so only
+        completed sessions are stored. Returns True if bars were added.
+        """
+        history = self._histories.setdefault(symbol, PriceHistory())
+        session_day, _ = calendar.last_close(exchange_for_symbol(symbol), now)
+        self._checked[symbol] = session_day
+        if not history.extend(bars, session_day):
+            return False
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return True
+
+    def _data_to_save(self) -> dict:
+        return {symbol: history.as_dict() for symbol, history in self._histories.items()}
+
+
+async def async_get_history_store(hass: HomeAssistant) -> HistoryStore:
+    """Return the history store shared by all config entries."""
+    return await HistoryStore.async_get(hass)
@@ -0,0 +1,534 @@
+"""Shared quote fetching for all config entries using the same API key."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import (
+    AlphaVantageClient,
+    AlphaVantageError,
+    DailyLimitError,
+    InvalidApiKeyError,
+    PremiumEndpointError,
+    RateLimitError,
+)
+from .breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+from .budget import RequestBudget, api_key_id, async_get_budget
+from .cache import QuoteCache, async_get_quote_cache
+from .const import API_TIERS, BULK_QUOTE_LIMIT, DATA_HUBS, DATA_KEY_VALIDATIONS, DEFAULT_TIER, DOMAIN
+from .market_hours import is_currency_pair
+from .metrics import RequestMetrics
+from .models import Quote
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long a key validation, or a successful request of a running entry, is trusted
+VALIDATION_TTL = 300
+VALIDATION_SYMBOL = "AAPL"
+# A rejected API key is left out of its pool for this long before it is tried again
+REJECTED_KEY_RETRY = 3600
+
+
+def parse_api_keys(value: str, default_tier: str = DEFAULT_TIER) -> dict[str, str]:
+    """Parse an API key pool such as "KEY1, KEY2:premium_75" into key -> tier.
+
+    Keys without a tier use default_tier. Raises ValueError for unknown tiers
+    or an empty pool.
+    """
+    keys = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, _, tier = item.partition(":")
+        tier = tier.strip() or default_tier
+        if tier not in API_TIERS:
+            raise ValueError(f"Unknown API plan {tier}")
+        keys[key.strip()] = tier
+    if not keys:
+        raise ValueError("No API key")
+    return keys
+
+
+class AlphaVantageHub:
+    """Owns the client and request budget of one API key.
+
+    Coordinators of all config entries using the key fetch through the hub.
+    A symbol tracked by several entries is fetched once: concurrent requests
+    for it are coalesced, recently fetched quotes are served from the cache
+    and every fetched quote is pushed to all coordinators tracking it.
+    """
+
+    def __init__(self, client: AlphaVantageClient, budget: RequestBudget, cache: QuoteCache) -> None:
+        """Initialize the hub."""
+        self.client = client
+        self.budget = budget
+        self.cache = cache
+        self.breaker = CircuitBreaker()
+        self.coordinators = set()
+        self.requests_saved = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._last_success = True  # Track status to reduce log noise
+        self.last_success_at: float | None = None  # monotonic time of the last good response
+        self.rejected_until: float | None = None  # monotonic time a rejected key is tried again
+
+    @property
+    def available(self) -> bool:
+        """Return False while the key is rejected or its daily quota is used up."""
+        if self.rejected_until is not None and time.monotonic() < self.rejected_until:
+            return False
+        return self.breaker.state != STATE_OPEN
+
+    @property
+    def symbols(self) -> set[str]:
+        """Return the union of the symbols of all registered coordinators."""
+        return {symbol for coordinator in self.coordinators for symbol in coordinator.symbols}
+
+    def register(self, coordinator) -> None:
+        """Register a coordinator to receive quotes fetched by other entries."""
+        self.coordinators.add(coordinator)
+
+    def unregister(self, coordinator) -> None:
+        """Stop pushing quotes to a coordinator."""
+        self.coordinators.discard(coordinator)
+
+    async def async_call(self, request, symbols):
+        """Await an API request for symbols, returning None if it failed."""
+        metrics = self.client.metrics
+        try:
+            result = await request
+        except InvalidApiKeyError as err:
+            metrics.observe_failure("invalid_key")
+            self.breaker.record_failure()
+            self.rejected_until = time.monotonic() + REJECTED_KEY_RETRY
+            # Trigger the re-auth flow
+            raise ConfigEntryAuthFailed(f"Invalid API Key: {err}") from err
+        except DailyLimitError:
+            metrics.observe_failure("daily_limit")
+            # Stops all requests with this key until the quota resets
+            self.breaker.record_daily_limit()
+            return None
+        except RateLimitError as err:
+            metrics.observe_failure("rate_limited")
+            # Rate limit notes are warnings
+            _LOGGER.warning("Alpha Vantage API Note: %s", err)
+            self.budget.note_rate_limited()
+        except PremiumEndpointError:
+            metrics.observe_failure("premium")
+            self.breaker.record_failure()
+            raise
+        except AlphaVantageError as err:
+            metrics.observe_failure("api_error")
+            _LOGGER.error("Alpha Vantage API Error for %s: %s", symbols, err)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            metrics.observe_failure(
+                "timeout" if isinstance(err, asyncio.TimeoutError) else "connection"
+            )
+            if self._last_success:
+                _LOGGER.error("Error communicating with Alpha Vantage: %s", err)
+                self._last_success = False
+            else:
+                _LOGGER.debug("Still failing to communicate with Alpha Vantage: %s", err)
+        else:
+            self._last_success = True
+            self.last_success_at = time.monotonic()
+            self.rejected_until = None
+            self.breaker.record_success()
+            return result
+        self.breaker.record_failure()
+        return None
+
+    async def async_get_quotes(self, symbols, acquire, max_age, requester):
+        """Return quotes for symbols, fetching only what nobody has fetched recently.
+
+        acquire reserves a request slot in the requester's update cycle.
+        Quotes fetched within max_age seconds, or max_age(symbol) seconds
+        when it is a function, are taken from the cache.
+        Returns the quotes and the symbols deferred for lack of budget.
+        """
+        quotes = {}
+        waiting = {}
+        to_fetch = []
+        now = time.time()
+        for symbol in symbols:
+            limit = max_age(symbol) if callable(max_age) else max_age
+            if symbol in self._inflight:
+                waiting[symbol] = self._inflight[symbol]
+            elif self.cache.get(symbol) is not None and now - self.cache.fetched_at(symbol) < limit:
+                quotes[symbol] = self.cache.get(symbol)
+                self.requests_saved += 1
+            else:
+                to_fetch.append(symbol)
+
+        loop = asyncio.get_running_loop()
+        futures = {symbol: loop.create_future() for symbol in to_fetch}
+        self._inflight.update(futures)
+        fetched = {}
+        deferred = []
+        try:
+            deferred = await self._async_fetch_quotes(to_fetch, acquire, fetched)
+        finally:
+            for symbol, future in futures.items():
+                self._inflight.pop(symbol, None)
+                future.set_result(fetched.get(symbol))
+
+        for symbol, quote in fetched.items():
+            self.cache.set(symbol, quote)
+        quotes.update(fetched)
+        self._push(fetched, requester)
+
+        for symbol, future in waiting.items():
+            quote = await future
+            if quote is not None:
+                quotes[symbol] = quote
+                self.requests_saved += 1
+        return quotes, deferred
+
+    def _push(self, quotes: dict[str, Quote], requester) -> None:
+        """Hand fetched quotes to every other coordinator tracking them."""
+        if not quotes:
+            return
+        for coordinator in self.coordinators:
+            if coordinator is not requester:
+                coordinator.async_push_quotes(quotes)
+
+    async def _async_fetch_quotes(self, symbols, acquire, quotes) -> list[str]:
+        """Fetch quotes into quotes within the request budget.
+
+        Uses bulk requests of up to BULK_QUOTE_LIMIT symbols when the API key
+        supports them and single GLOBAL_QUOTE requests otherwise. Currency
+        pairs are fetched last with CURRENCY_EXCHANGE_RATE. Returns the
+        symbols deferred to a later cycle.
+        """
+        pending = [symbol for symbol in symbols if not is_currency_pair(symbol)]
+        pairs = [symbol for symbol in symbols if is_currency_pair(symbol)]
+
+        if self.client.bulk_supported and len(pending) > 1:
+            single = []
+            while pending:
+                chunk, pending = pending[:BULK_QUOTE_LIMIT], pending[BULK_QUOTE_LIMIT:]
+                if not await acquire():
+                    return chunk + pending + single + pairs
+                try:
+                    result = await self.async_call(
+                        self.client.async_get_bulk_quotes(chunk), ", ".join(chunk)
+                    )
+                except PremiumEndpointError:
+                    _LOGGER.info(
+                        "Bulk quotes are not available for this API key, using single quotes"
+                    )
+                    single.extend(chunk + pending)
+                    break
+                if result is None:
+                    continue
+                for symbol in chunk:
+                    if symbol in result:
+                        quotes[symbol] = result[symbol]
+                    else:
+                        # Bulk quotes only cover US markets, fetch the others one by one
+                        single.append(symbol)
+            pending = single
+
+        pending += pairs
+        for index, symbol in enumerate(pending):
+            if not await acquire():
+                return pending[index:]
+            if is_currency_pair(symbol):
+                request = self.client.async_get_exchange_rate(symbol)
+            else:
+                request = self.client.async_get_quote(symbol)
+            try:
+                quote = await self.async_call(request, symbol)
+            except PremiumEndpointError as err:
+                _LOGGER.error("Alpha Vantage API Error for %s: %s", symbol, err)
+                quote = None
+            if quote:
+                quotes[symbol] = quote
+        return []
+
+    def as_dict(self) -> dict:
+        """Return hub statistics for diagnostics."""
+        return {
+            "entries": len(self.coordinators),
+            "symbols": len(self.symbols),
+            "requests_saved": self.requests_saved,
+            "bulk_supported": self.client.bulk_supported,
+            "available": self.available,
+            "breaker": self.breaker.as_dict(),
+        }
+
+
+class HubPool:
+    """Dispatches the requests of a config entry over the hubs of its API keys.
+
+    Symbols are divided by what each key can still fetch in the update
+    cycle, given its remaining budget and whether its plan has bulk quotes.
+    The keys fetch their shares concurrently, so throughput grows with the
+    number of keys. Keys that reached their daily limit or were rejected
+    are left out of rotation until they recover.
+    """
+
+    def __init__(self, hubs: list[AlphaVantageHub]) -> None:
+        """Initialize the pool."""
+        self.hubs = hubs
+        self.cache = hubs[0].cache  # shared by all hubs
+
+    @property
+    def symbols(self) -> set[str]:
+        """Return the union of the symbols of all entries using the keys."""
+        return set().union(*(hub.symbols for hub in self.hubs))
+
+    def register(self, coordinator) -> None:
+        """Register a coordinator with the hub of every key."""
+        for hub in self.hubs:
+            hub.register(coordinator)
+
+    def unregister(self, coordinator) -> None:
+        """Unregister a coordinator from the hub of every key."""
+        for hub in self.hubs:
+            hub.unregister(coordinator)
+
+    def _weight(self, hub: AlphaVantageHub, capacity) -> float:
+        """Return how many symbols a key can take on in this cycle."""
+        if not hub.available:
+            return 0
+        requests = capacity(hub)
+        if requests is None:
+            # No daily limit, the per-minute limit decides
+            requests = hub.budget.minute.capacity
+        return requests * (BULK_QUOTE_LIMIT if hub.client.bulk_supported else 1)
+
+    def pick(self, capacity) -> AlphaVantageHub | None:
+        """Return the key with the most capacity left, None if all are out of rotation."""
+        weight, hub = max(((self._weight(hub, capacity), hub) for hub in self.hubs), key=lambda item: item[0])
+        return hub if weight > 0 else None
+
+    def _divide(self, symbols: list[str], hubs: list[AlphaVantageHub], capacity) -> dict:
+        """Divide symbols over keys in proportion to their weight, keeping their order."""
+        weights = {hub: self._weight(hub, capacity) for hub in hubs}
+        shares = {hub: [] for hub, weight in weights.items() if weight > 0}
+        if not shares:
+            return {}
+        for symbol in symbols:
+            # Highest averages method, so every key's share follows its weight
+            hub = max(shares, key=lambda hub: weights[hub] / (len(shares[hub]) + 1))
+            shares[hub].append(symbol)
+        return shares
+
+    async def async_call(self, hub: AlphaVantageHub, request, symbols, requester):
+        """Await an API request made with one of the keys, see AlphaVantageHub.async_call."""
+        try:
+            return await hub.async_call(request, symbols)
+        except ConfigEntryAuthFailed:
+            self._rejected(hub, requester)
+            return None
+
+    async def async_get_quotes(self, symbols, acquire, max_age, requester, capacity):
+        """Return quotes for symbols, fetched with the keys that have capacity left.
+
+        acquire reserves a request slot of a key, capacity returns how many
+        requests a key may still make in this cycle (None for no daily
+        limit). Symbols a key could not fetch for lack of budget are handed
+        to the keys that still have some. Returns the quotes and the symbols
+        deferred to a later cycle.
+        """
+        quotes = {}
+        pending = list(symbols)
+        exhausted = set()
+        while pending:
+            shares = self._divide(pending, [hub for hub in self.hubs if hub not in exhausted], capacity)
+            if not shares:
+                break
+            results = await asyncio.gather(
+                *(
+                    hub.async_get_quotes(share, functools.partial(acquire, hub), max_age, requester)
+                    for hub, share in shares.items()
+                ),
+                return_exceptions=True,
+            )
+            pending = []
+            for (hub, share), result in zip(shares.items(), results):
+                if isinstance(result, ConfigEntryAuthFailed):
+                    self._rejected(hub, requester)
+                    result = ({}, share)
+                elif isinstance(result, BaseException):
+                    raise result
+                fetched, deferred = result
+                quotes.update(fetched)
+                if deferred:
+                    exhausted.add(hub)
+                    pending.extend(deferred)
+            if len(self.hubs) == 1:
+                break
+        return quotes, pending
+
+    def _rejected(self, hub: AlphaVantageHub, requester) -> None:
+        """Take a rejected key out of rotation and ask for a new one.
+
+        While other keys of the pool still work, only the rejected key is
+        re-authenticated. Without a working key the entry's re-auth flow
+        starts as for a single key.
+        """
+        if not any(other.available for other in self.hubs):
+            raise ConfigEntryAuthFailed("All API keys of the entry were rejected")
+        _LOGGER.warning("Alpha Vantage rejected an API key, using the other keys of the entry")
+        requester.async_start_key_reauth(hub.client.api_key)
+
+    @property
+    def metrics(self) -> RequestMetrics:
+        """Return the request metrics of all keys."""
+        if len(self.hubs) == 1:
+            return self.hubs[0].client.metrics
+        metrics = RequestMetrics()
+        for hub in self.hubs:
+            metrics.merge(hub.client.metrics)
+        return metrics
+
+    @property
+    def breaker_state(self) -> str:
+        """Return open when no key may send requests, half-open when some keys are paused."""
+        states = {hub.breaker.state for hub in self.hubs}
+        if states == {STATE_OPEN}:
+            return STATE_OPEN
+        if states == {STATE_CLOSED}:
+            return STATE_CLOSED
+        return STATE_HALF_OPEN
+
+    @property
+    def reset_at(self):
+        """Return when the first paused key gets its daily quota back."""
+        return min((hub.breaker.reset_at for hub in self.hubs if hub.breaker.state == STATE_OPEN), default=None)
+
+    def request_rate(self, symbols: list[str]) -> float | None:
+        """Return the request rate the keys' daily quotas allow for the symbols.
+
+        Entries sharing a key split its quota by their number of symbols.
+        None means at least one key has no daily limit.
+        """
+        total = 0.0
+        for hub in self.hubs:
+            if not hub.available:
+                continue
+            rate = hub.budget.request_rate()
+            if rate is None:
+                return None
+            total += rate * len(symbols) / max(len(hub.symbols), len(symbols))
+        return total
+
+    @property
+    def remaining_this_minute(self) -> int:
+        """Return requests the keys can make right away."""
+        return sum(hub.budget.remaining_this_minute for hub in self.hubs if hub.available)
+
+    @property
+    def remaining_today(self) -> int | None:
+        """Return requests left today over all keys, None without a daily limit."""
+        remaining = [hub.budget.remaining_today for hub in self.hubs if hub.available]
+        if any(value is None for value in remaining):
+            return None
+        return sum(remaining)
+
+    def as_dict(self) -> dict:
+        """Return the hub and budget of every key for diagnostics."""
+        return {
+            hub.budget.key_id: {**hub.as_dict(), "budget": hub.budget.as_dict()}
+            for hub in self.hubs
+        }
+
+
+async def async_get_hub(hass: HomeAssistant, api_key: str, tier: str) -> AlphaVantageHub:
+    """Return the hub of an API key, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    hubs = domain_data.setdefault(DATA_HUBS, {})
+    # Resolve the shared budget first so a tier change applies to existing hubs
+    budget = await async_get_budget(hass, api_key, tier)
+    key_id = api_key_id(api_key)
+    hub = hubs.get(key_id)
+    if hub is None:
+        client = AlphaVantageClient(
+            async_get_clientsession(hass),
+            api_key,
+            bulk=API_TIERS.get(tier, {}).get("bulk", False),
+            full_history=API_TIERS.get(tier, {}).get("full_history", False),
+        )
+        hub = hubs[key_id] = AlphaVantageHub(client, budget, await async_get_quote_cache(hass))
+    return hub
+
+
+async def async_get_pool(hass: HomeAssistant, api_keys: str, tier: str) -> HubPool:
+    """Return a pool over the hubs of an API key option, see parse_api_keys."""
+    return HubPool(
+        [await async_get_hub(hass, api_key, key_tier) for api_key, key_tier in parse_api_keys(api_keys, tier).items()]
+    )
+
+
+class KeyValidator:
+    """Validates API keys for the config flows without spending quota twice.
+
+    Concurrent validations of a key share one request and results are kept
+    for VALIDATION_TTL seconds. A key that a running entry used successfully
+    within that time is accepted without a request.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the validator."""
+        self._hass = hass
+        self._results: dict[str, tuple[bool, float]] = {}  # key id -> (valid, expiry)
+        self._pending: dict[str, asyncio.Task] = {}
+
+    async def async_validate(self, api_key: str) -> bool:
+        """Return False if Alpha Vantage rejects the API key."""
+        key_id = api_key_id(api_key)
+        now = time.monotonic()
+        hub = self._hass.data[DOMAIN].get(DATA_HUBS, {}).get(key_id)
+        if hub is not None and hub.last_success_at is not None and now - hub.last_success_at < VALIDATION_TTL:
+            return True
+        cached = self._results.get(key_id)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+
+        task = self._pending.get(key_id)
+        if task is None:
+            task = self._pending[key_id] = self._hass.async_create_task(self._async_request(api_key))
+        try:
+            valid = await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._pending.pop(key_id, None)
+        if valid is None:
+            # Could not reach Alpha Vantage, try again next time
+            return False
+        self._results[key_id] = (valid, time.monotonic() + VALIDATION_TTL)
+        return valid
+
+    async def _async_request(self, api_key: str) -> bool | None:
+        """Request a quote with the key; None if the API could not be reached."""
+        client = AlphaVantageClient(async_get_clientsession(self._hass), api_key)
+        try:
+            await client.async_get_quote(VALIDATION_SYMBOL)
+        except InvalidApiKeyError:
+            return False
+        except (RateLimitError, PremiumEndpointError):
+            # The key was accepted, it is just out of requests
+            return True
+        except (AlphaVantageError, aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Could not validate the API key: %s", err)
+            return None
+        return True
+
+
+async def async_validate_api_key(hass: HomeAssistant, api_key: str) -> bool:
+    """Return False if Alpha Vantage rejects the API key."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    validator = domain_data.get(DATA_KEY_VALIDATIONS)
+    if validator is None:
+        validator = domain_data[DATA_KEY_VALIDATIONS] = KeyValidator(hass)
+    return await validator.async_validate(api_key)
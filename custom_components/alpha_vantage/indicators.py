@@ -0,0 +1,152 @@
+"""Technical indicators computed locally from the stored price history."""
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+
+from .history import HistoryStore
+from .models import IndicatorStats
+
+WINDOW = 20  # Bollinger bands, 20-day average and volatility
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+EMA_PERIOD = 20
+TRADING_DAYS = 252
+
+# Bars replayed when a symbol is first seen, enough for the averages to settle
+WARMUP_BARS = 300
+
+
+def _alpha(period: int) -> float:
+    return 2 / (period + 1)
+
+
+class IndicatorEngine:
+    """Keeps indicator state for many symbols in arrays and updates it per bar.
+
+    Every new bar is folded into running state (EMAs, Wilder averages, ring
+    buffers of the last WINDOW closes and returns), one vectorized step for
+    all symbols that have a bar at that step, so the history is never
+    scanned again.
+    """
+
+    def __init__(self, symbols: list[str]) -> None:
+        """Initialize empty state for the symbols."""
+        self.symbols = list(symbols)
+        self._index = {symbol: index for index, symbol in enumerate(self.symbols)}
+        size = len(self.symbols)
+        self.last_day = np.zeros(size, dtype=np.int64)  # ordinal of the last bar seen
+        self.count = np.zeros(size, dtype=np.int64)
+        self.close = np.zeros(size)
+        self.peak = np.zeros(size)
+        self.ema_fast = np.zeros(size)
+        self.ema_slow = np.zeros(size)
+        self.ema = np.zeros(size)
+        self.macd_signal = np.zeros(size)
+        self.avg_gain = np.zeros(size)
+        self.avg_loss = np.zeros(size)
+        self.closes = np.zeros((size, WINDOW))
+        self.returns = np.zeros((size, WINDOW))
+
+    def advance(self, store: HistoryStore) -> set[str]:
+        """Fold bars added to the store since the last call into the state.
+
+        Returns the symbols that received new bars.
+        """
+        pending = []
+        for index, symbol in enumerate(self.symbols):
+            history = store.get(symbol)
+            if not history:
+                continue
+            days = np.frombuffer(history.days, dtype=np.int32)
+            closes = np.frombuffer(history.close, dtype=np.float64)
+            start = int(np.searchsorted(days, self.last_day[index], side="right"))
+            if start >= len(days):
+                continue
+            if self.count[index] == 0 and len(days) - start > WARMUP_BARS:
+                # Only replay the tail; the peak still covers the whole history
+                self.peak[index] = closes[: len(days) - WARMUP_BARS].max()
+                start = len(days) - WARMUP_BARS
+            pending.append((index, closes[start:], days[-1]))
+
+        if not pending:
+            return set()
+
+        # Align the new bars of all symbols column by column, NaN padded
+        steps = max(len(closes) for _, closes, _ in pending)
+        matrix = np.full((len(self.symbols), steps), np.nan)
+        for index, closes, last_day in pending:
+            matrix[index, : len(closes)] = closes
+            self.last_day[index] = last_day
+        for step in range(steps):
+            column = matrix[:, step]
+            indices = np.flatnonzero(~np.isnan(column))
+            self._step(indices, column[indices])
+        return {self.symbols[index] for index, _, _ in pending}
+
+    def _step(self, idx: np.ndarray, close: np.ndarray) -> None:
+        """Apply one bar per symbol in idx."""
+        count = self.count[idx]
+        first = count == 0
+        prev = np.where(first, close, self.close[idx])
+        change = close - prev
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_return = np.where(prev > 0, np.log(close / prev), 0.0)
+
+        def ema(state, alpha):
+            state[idx] = np.where(first, close, state[idx] + alpha * (close - state[idx]))
+
+        ema(self.ema_fast, _alpha(MACD_FAST))
+        ema(self.ema_slow, _alpha(MACD_SLOW))
+        ema(self.ema, _alpha(EMA_PERIOD))
+        macd = self.ema_fast[idx] - self.ema_slow[idx]
+        self.macd_signal[idx] = np.where(
+            first, macd, self.macd_signal[idx] + _alpha(MACD_SIGNAL) * (macd - self.macd_signal[idx])
+        )
+
+        # Wilder smoothing, seeded with the simple average of the first changes
+        weight = np.maximum(np.minimum(count, RSI_PERIOD), 1)
+        gain = np.maximum(change, 0)
+        loss = np.maximum(-change, 0)
+        self.avg_gain[idx] = np.where(first, 0, self.avg_gain[idx] + (gain - self.avg_gain[idx]) / weight)
+        self.avg_loss[idx] = np.where(first, 0, self.avg_loss[idx] + (loss - self.avg_loss[idx]) / weight)
+
+        slot = count % WINDOW
+        self.closes[idx, slot] = close
+        self.returns[idx, slot] = log_return
+        self.peak[idx] = np.maximum(self.peak[idx], close)
+        self.close[idx] = close
+        self.count[idx] = count + 1
+
+    def stats(self, symbol: str) -> IndicatorStats:
+        """Return the current indicator values of a symbol."""
+        index = self._index[symbol]
+        count = int(self.count[index])
+        if not count:
+            return IndicatorStats()
+
+        stats = IndicatorStats(
+            latest_trading_day=date.fromordinal(int(self.last_day[index])).isoformat(),
+            ema_20=float(self.ema[index]) if count >= EMA_PERIOD else None,
+            drawdown=float((self.close[index] / self.peak[index] - 1) * 100) if self.peak[index] else None,
+        )
+        if count >= WINDOW:
+            mean = float(self.closes[index].mean())
+            spread = 2 * float(self.closes[index].std())
+            stats.sma_20 = mean
+            stats.bollinger_upper = mean + spread
+            stats.bollinger_lower = mean - spread
+        if count > WINDOW:
+            # The window only holds real returns once the first bar has left it
+            stats.volatility = float(self.returns[index].std(ddof=1) * np.sqrt(TRADING_DAYS) * 100)
+        if count > RSI_PERIOD:
+            gain, loss = self.avg_gain[index], self.avg_loss[index]
+            stats.rsi_14 = 100.0 if not loss else float(100 - 100 / (1 + gain / loss))
+        if count >= MACD_SLOW:
+            stats.macd = float(self.ema_fast[index] - self.ema_slow[index])
+        if count >= MACD_SLOW + MACD_SIGNAL:
+            stats.macd_signal = float(self.macd_signal[index])
+        return stats
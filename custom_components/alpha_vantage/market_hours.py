@@ -0,0 +1,200 @@
+"""Exchange trading calendars used to schedule Alpha Vantage polls."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from .models import Quote
+
+_LOGGER = logging.getLogger(__name__)
+
+# Alpha Vantage publishes the closing quote shortly after the session ends
+CLOSE_SETTLE_DELAY = timedelta(minutes=20)
+
+
+@dataclass(frozen=True)
+class Exchange:
+    """Regular trading session of an exchange."""
+
+    code: str
+    timezone: str
+    open: time
+    close: time
+    currency: str
+    weekdays: tuple = (0, 1, 2, 3, 4)
+
+
+EXCHANGES = {
+    "US": Exchange("US", "America/New_York", time(9, 30), time(16, 0), "USD"),
+    "LSE": Exchange("LSE", "Europe/London", time(8, 0), time(16, 30), "GBP"),
+    "XETRA": Exchange("XETRA", "Europe/Berlin", time(9, 0), time(17, 30), "EUR"),
+    "EPA": Exchange("EPA", "Europe/Paris", time(9, 0), time(17, 30), "EUR"),
+    "TSX": Exchange("TSX", "America/Toronto", time(9, 30), time(16, 0), "CAD"),
+    "TSXV": Exchange("TSXV", "America/Toronto", time(9, 30), time(16, 0), "CAD"),
+    "BSE": Exchange("BSE", "Asia/Kolkata", time(9, 15), time(15, 30), "INR"),
+    "SSE": Exchange("SSE", "Asia/Shanghai", time(9, 30), time(15, 0), "CNY"),
+    "SZSE": Exchange("SZSE", "Asia/Shanghai", time(9, 30), time(15, 0), "CNY"),
+}
+
+# Symbol suffixes as used by Alpha Vantage (e.g. TSCO.LON), plus common aliases
+SYMBOL_SUFFIXES = {
+    "LON": "LSE",
+    "L": "LSE",
+    "DEX": "XETRA",
+    "DE": "XETRA",
+    "PAR": "EPA",
+    "PA": "EPA",
+    "TRT": "TSX",
+    "TO": "TSX",
+    "TRV": "TSXV",
+    "V": "TSXV",
+    "BSE": "BSE",
+    "BO": "BSE",
+    "SHH": "SSE",
+    "SS": "SSE",
+    "SHZ": "SZSE",
+    "SZ": "SZSE",
+}
+
+
+def is_currency_pair(symbol: str) -> bool:
+    """Return True for currency and crypto pairs such as EUR/USD or BTC/EUR."""
+    return "/" in symbol
+
+
+def exchange_for_symbol(symbol: str) -> Exchange:
+    """Return the exchange a symbol trades on, derived from its suffix."""
+    _, _, suffix = symbol.rpartition(".")
+    return EXCHANGES[SYMBOL_SUFFIXES.get(suffix, "US")]
+
+
+def parse_holidays(value: str) -> dict[str | None, set[date]]:
+    """Parse a holiday list such as "2026-12-25, LSE:2026-12-28".
+
+    Dates without an exchange prefix apply to every exchange.
+    """
+    holidays: dict[str | None, set[date]] = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        code, _, day = item.rpartition(":")
+        try:
+            parsed = date.fromisoformat(day.strip())
+        except ValueError:
+            _LOGGER.warning("Ignoring invalid holiday %s", item)
+            continue
+        holidays.setdefault(code.strip().upper() or None, set()).add(parsed)
+    return holidays
+
+
+class MarketCalendar:
+    """Answers when exchanges trade, taking configured holidays into account."""
+
+    def __init__(self, holidays: str = "") -> None:
+        """Initialize the calendar."""
+        self._holidays = parse_holidays(holidays)
+
+    def is_trading_day(self, exchange: Exchange, day: date) -> bool:
+        """Return True if the exchange has a session on the given local date."""
+        if day.weekday() not in exchange.weekdays:
+            return False
+        return day not in self._holidays.get(None, ()) and day not in self._holidays.get(
+            exchange.code, ()
+        )
+
+    def _session(self, exchange: Exchange, day: date) -> tuple[datetime, datetime]:
+        """Return the UTC open and close of a session on a local date."""
+        tz = ZoneInfo(exchange.timezone)
+        return (
+            datetime.combine(day, exchange.open, tz).astimezone(timezone.utc),
+            datetime.combine(day, exchange.close, tz).astimezone(timezone.utc),
+        )
+
+    def _local_date(self, exchange: Exchange, now: datetime) -> date:
+        return now.astimezone(ZoneInfo(exchange.timezone)).date()
+
+    def is_open(self, exchange: Exchange, now: datetime) -> bool:
+        """Return True if the exchange is in its regular session."""
+        day = self._local_date(exchange, now)
+        if not self.is_trading_day(exchange, day):
+            return False
+        start, end = self._session(exchange, day)
+        return start <= now < end
+
+    def last_close(self, exchange: Exchange, now: datetime) -> tuple[date, datetime]:
+        """Return the date and UTC close of the most recent completed session."""
+        day = self._local_date(exchange, now)
+        # Bounded look-back keeps a misconfigured holiday list from looping forever
+        for _ in range(30):
+            if self.is_trading_day(exchange, day):
+                close = self._session(exchange, day)[1]
+                if close <= now:
+                    return day, close
+            day -= timedelta(days=1)
+        return day, self._session(exchange, day)[1]
+
+    def next_open(self, exchange: Exchange, now: datetime) -> datetime:
+        """Return the UTC start of the next session that has not started yet."""
+        day = self._local_date(exchange, now)
+        for _ in range(30):
+            if self.is_trading_day(exchange, day):
+                start = self._session(exchange, day)[0]
+                if start > now:
+                    return start
+            day += timedelta(days=1)
+        return now + timedelta(days=1)
+
+    def _has_closing_quote(
+        self, exchange: Exchange, quote: Quote, fetched: datetime, now: datetime
+    ) -> bool:
+        """Return True if the quote already reflects the last completed session."""
+        session_day, close = self.last_close(exchange, now)
+        if fetched >= close + CLOSE_SETTLE_DELAY:
+            return True
+        return (
+            fetched >= close
+            and quote.latest_trading_day == session_day.isoformat()
+        )
+
+    def needs_refresh(
+        self, symbol: str, quote: Quote | None, fetched_at: float, now: datetime
+    ) -> bool:
+        """Return True if polling the symbol now can yield a newer quote."""
+        if is_currency_pair(symbol):
+            # Currencies and crypto trade around the clock
+            return True
+        exchange = exchange_for_symbol(symbol)
+        if quote is None or self.is_open(exchange, now):
+            return True
+        fetched = datetime.fromtimestamp(fetched_at, timezone.utc)
+        if self._has_closing_quote(exchange, quote, fetched, now):
+            return False
+        # Fetch the closing quote once the provider has settled it
+        _, close = self.last_close(exchange, now)
+        return now >= close + CLOSE_SETTLE_DELAY
+
+    def next_poll(
+        self, symbol: str, quote: Quote | None, fetched_at: float, now: datetime, regular: datetime
+    ) -> datetime:
+        """Return when the symbol should be polled next.
+
+        regular is when the symbol would be polled next around the clock.
+        """
+        if is_currency_pair(symbol):
+            return regular
+        exchange = exchange_for_symbol(symbol)
+        if self.is_open(exchange, now):
+            # Poll during the session and once more after the close
+            close = self._session(exchange, self._local_date(exchange, now))[1]
+            return min(regular, close + CLOSE_SETTLE_DELAY)
+        if self.needs_refresh(symbol, quote, fetched_at, now):
+            # Due but not fetched yet, e.g. deferred by the request budget
+            return regular
+        fetched = datetime.fromtimestamp(fetched_at, timezone.utc)
+        if not self._has_closing_quote(exchange, quote, fetched, now):
+            _, close = self.last_close(exchange, now)
+            return close + CLOSE_SETTLE_DELAY
+        return self.next_open(exchange, now)
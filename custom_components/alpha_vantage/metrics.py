@@ -0,0 +1,130 @@
+"""Request instrumentation for the Alpha Vantage integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+
+# Upper bounds of the latency histogram buckets in seconds, plus an overflow bucket
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of request latencies."""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add one latency."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Add the observations of another histogram."""
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean latency in seconds."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> float | None:
+        """Return the upper bound of the bucket holding the q quantile.
+
+        Quantiles in the overflow bucket are reported as the maximum latency.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self) -> dict:
+        """Return the histogram for diagnostics."""
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class RequestMetrics:
+    """Timings and failure counts of the requests made with one API key."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.latency: dict[str, LatencyHistogram] = {}  # per API function
+        self.decode_count = 0
+        self.decode_time = 0.0
+        self.wait_time = 0.0  # spent waiting for a request slot
+        self.failures: Counter[str] = Counter()
+
+    def observe_request(self, function: str, seconds: float) -> None:
+        """Record the latency of a request, up to the last byte of the body."""
+        histogram = self.latency.get(function)
+        if histogram is None:
+            histogram = self.latency[function] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def observe_decode(self, seconds: float) -> None:
+        """Record the time spent decoding a response body."""
+        self.decode_count += 1
+        self.decode_time += seconds
+
+    def observe_wait(self, seconds: float) -> None:
+        """Record time spent waiting for the rate limit."""
+        self.wait_time += seconds
+
+    def observe_failure(self, category: str) -> None:
+        """Count a failed request by category."""
+        self.failures[category] += 1
+
+    def merge(self, other: RequestMetrics) -> None:
+        """Add the metrics of another API key."""
+        for function, histogram in other.latency.items():
+            self.latency.setdefault(function, LatencyHistogram()).merge(histogram)
+        self.decode_count += other.decode_count
+        self.decode_time += other.decode_time
+        self.wait_time += other.wait_time
+        self.failures.update(other.failures)
+
+    @property
+    def total_latency(self) -> LatencyHistogram:
+        """Return the latencies of all functions in one histogram."""
+        total = LatencyHistogram()
+        for histogram in self.latency.values():
+            total.merge(histogram)
+        return total
+
+    @property
+    def mean_decode_time(self) -> float | None:
+        """Return the mean decode time in seconds."""
+        return self.decode_time / self.decode_count if self.decode_count else None
+
+    def as_dict(self) -> dict:
+        """Return the metrics for diagnostics."""
+        return {
+            "latency": {function: histogram.as_dict() for function, histogram in self.latency.items()},
+            "decode_count": self.decode_count,
+            "decode_time": self.decode_time,
+            "wait_time": self.wait_time,
+            "failures": dict(self.failures),
+        }
@@ -0,0 +1,155 @@
+"""Data models for the Alpha Vantage integration."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+
+from .const import SENSOR_TYPES
+
+# GLOBAL_QUOTE field -> Quote attribute, derived from the symbol sensors
+GLOBAL_QUOTE_FIELDS = {
+    "02. open": "open",
+    **{
+        info["json_path"][0]: info["attribute"]
+        for info in SENSOR_TYPES.values()
+        if info["category"] == "symbol"
+    },
+}
+
+# REALTIME_BULK_QUOTES field -> Quote attribute
+BULK_QUOTE_FIELDS = {
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "price",
+    "volume": "volume",
+    "previous_close": "previous_close",
+    "change": "change",
+    "change_percent": "change_percent",
+}
+
+
+def _to_float(value) -> float | None:
+    """Parse a numeric API value such as "189.1200" or "-0.4512%"."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip().rstrip('%')
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+@dataclass(slots=True)
+class Quote:
+    """A parsed quote with typed numeric fields."""
+
+    symbol: str
+    price: float | None = None
+    open: float | None = None
+    high: float | None = None
+    low: float | None = None
+    volume: float | None = None
+    previous_close: float | None = None
+    change: float | None = None
+    change_percent: float | None = None
+    latest_trading_day: str | None = None
+
+    @classmethod
+    def from_global_quote(cls, data: dict) -> Quote:
+        """Parse a GLOBAL_QUOTE payload."""
+        quote = cls(
+            symbol=data.get("01. symbol", "").upper(),
+            latest_trading_day=data.get("07. latest trading day"),
+        )
+        for key, attribute in GLOBAL_QUOTE_FIELDS.items():
+            setattr(quote, attribute, _to_float(data.get(key)))
+        return quote
+
+    @classmethod
+    def from_bulk_quote(cls, data: dict) -> Quote:
+        """Parse one entry of a REALTIME_BULK_QUOTES payload."""
+        timestamp = data.get("timestamp")
+        quote = cls(
+            symbol=str(data.get("symbol", "")).upper(),
+            latest_trading_day=str(timestamp)[:10] if timestamp else None,
+        )
+        for key, attribute in BULK_QUOTE_FIELDS.items():
+            setattr(quote, attribute, _to_float(data.get(key)))
+        return quote
+
+    @classmethod
+    def from_exchange_rate(cls, data: dict) -> Quote:
+        """Parse a CURRENCY_EXCHANGE_RATE payload into a quote of the pair."""
+        last_refreshed = data.get("6. Last Refreshed")
+        return cls(
+            symbol=f'{data.get("1. From_Currency Code", "")}/{data.get("3. To_Currency Code", "")}'.upper(),
+            price=_to_float(data.get("5. Exchange Rate")),
+            latest_trading_day=str(last_refreshed)[:10] if last_refreshed else None,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Quote:
+        """Restore a quote stored with as_dict, or from a raw GLOBAL_QUOTE payload."""
+        if "05. price" in data:
+            return cls.from_global_quote(data)
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+    def as_dict(self) -> dict:
+        """Return the quote as a JSON serializable dict."""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class HistoryStats:
+    """Metrics computed from the locally stored daily price history."""
+
+    latest_trading_day: str | None = None
+    sma_50: float | None = None
+    sma_200: float | None = None
+    high_52w: float | None = None
+    low_52w: float | None = None
+    return_1m: float | None = None
+    return_1y: float | None = None
+
+    def as_dict(self) -> dict:
+        """Return the stats as a JSON serializable dict."""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class IndicatorStats:
+    """Technical indicators computed from the locally stored daily price history."""
+
+    latest_trading_day: str | None = None
+    sma_20: float | None = None
+    ema_20: float | None = None
+    rsi_14: float | None = None
+    macd: float | None = None
+    macd_signal: float | None = None
+    bollinger_upper: float | None = None
+    bollinger_lower: float | None = None
+    volatility: float | None = None
+    drawdown: float | None = None
+
+    def as_dict(self) -> dict:
+        """Return the indicators as a JSON serializable dict."""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class PortfolioStats:
+    """Totals of the configured holdings, computed from their latest quotes."""
+
+    latest_trading_day: str | None = None
+    value: float | None = None
+    day_change: float | None = None
+    day_change_percent: float | None = None
+    cost: float | None = None
+    unrealized_pl: float | None = None
+    unrealized_pl_percent: float | None = None
+
+    def as_dict(self) -> dict:
+        """Return the totals as a JSON serializable dict."""
+        return asdict(self)
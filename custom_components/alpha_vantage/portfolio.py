@@ -0,0 +1,79 @@
+"""Portfolio totals computed locally from the quotes of the held symbols."""
+from __future__ import annotations
+
+import math
+
+from collections.abc import Callable
+
+from .models import PortfolioStats, Quote
+from .scheduler import parse_symbol_settings
+
+# Key of the portfolio totals in the coordinator data and change tracking
+PORTFOLIO = "PORTFOLIO"
+
+
+def parse_holdings(value: str) -> dict[str, tuple[float, float | None]]:
+    """Parse holdings such as "AAPL:10@150.5, TSLA:5".
+
+    Each symbol has a quantity, optionally followed by the cost basis per
+    share. Raises ValueError for malformed or non-finite numbers.
+    """
+    holdings = {}
+    for symbol, setting in parse_symbol_settings(value).items():
+        quantity, _, cost = setting.partition("@")
+        quantity = float(quantity)
+        cost = float(cost) if cost.strip() else None
+        if not math.isfinite(quantity) or (cost is not None and not math.isfinite(cost)):
+            raise ValueError(f"Invalid holding {symbol}:{setting}")
+        holdings[symbol] = (quantity, cost)
+    return holdings
+
+
+def portfolio_stats(
+    holdings: dict[str, tuple[float, float | None]],
+    quotes: dict[str, Quote],
+    rate_for: Callable[[str], float | None] = lambda symbol: 1.0,
+) -> PortfolioStats:
+    """Return value, day change and unrealized P&L of the holdings in one pass.
+
+    rate_for returns the factor converting a symbol's prices into the home
+    currency. Holdings without a quote or rate yet are left out. The
+    unrealized P&L only covers holdings with a cost basis.
+    """
+    stats = PortfolioStats()
+    value = previous_value = day_change = cost = covered_value = 0.0
+    priced = changed = costed = False
+    for symbol, (quantity, cost_basis) in holdings.items():
+        quote = quotes.get(symbol)
+        rate = rate_for(symbol)
+        if quote is None or quote.price is None or rate is None:
+            continue
+        position = quantity * quote.price * rate
+        value += position
+        priced = True
+        if quote.change is not None:
+            change = quantity * quote.change * rate
+            day_change += change
+            previous_value += position - change
+            changed = True
+        if cost_basis is not None:
+            cost += quantity * cost_basis
+            covered_value += position
+            costed = True
+        if quote.latest_trading_day and (
+            stats.latest_trading_day is None or quote.latest_trading_day > stats.latest_trading_day
+        ):
+            stats.latest_trading_day = quote.latest_trading_day
+
+    if priced:
+        stats.value = value
+    if changed:
+        stats.day_change = day_change
+        if previous_value:
+            stats.day_change_percent = day_change / previous_value * 100
+    if costed:
+        stats.cost = cost
+        stats.unrealized_pl = covered_value - cost
+        if cost:
+            stats.unrealized_pl_percent = (covered_value - cost) / cost * 100
+    return stats
@@ -0,0 +1,245 @@
+"""Per-symbol refresh scheduling for the Alpha Vantage integration."""
+from __future__ import annotations
+
+import math
+import random
+from datetime import datetime, timedelta
+
+from .cache import QuoteCache
+from .const import DEFAULT_PRIORITY, MAX_REFRESH_PERIOD, MIN_POLL_INTERVAL, PRIORITY_WEIGHTS
+from .market_hours import MarketCalendar, exchange_for_symbol, is_currency_pair
+
+# Retry delays are randomized by up to this fraction so failed symbols of
+# several entries do not retry in lockstep
+RETRY_JITTER = 0.25
+
+
+def parse_symbol_settings(value: str) -> dict[str, str]:
+    """Parse per-symbol settings such as "AAPL:high, TSLA:low".
+
+    Raises ValueError for items without a symbol or a value.
+    """
+    settings = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        symbol, _, setting = item.rpartition(":")
+        if not symbol.strip() or not setting.strip():
+            raise ValueError(f"Invalid symbol setting {item}")
+        settings[symbol.strip().upper()] = setting.strip().lower()
+    return settings
+
+
+class RefreshScheduler:
+    """Decides which symbols are due and when the coordinator runs next.
+
+    In staggered mode every symbol has its own due time, spread evenly over
+    the scan interval, so each update only refreshes a few symbols. Symbols
+    whose fetch failed are retried with jittered exponential backoff,
+    starting at MIN_POLL_INTERVAL and capped at the scan interval.
+
+    Symbols can have a priority and a target freshness. The request budget
+    is divided by priority weight and symbols then follow their own refresh
+    period instead of the common scan interval.
+    """
+
+    def __init__(
+        self,
+        interval: timedelta,
+        calendar: MarketCalendar | None = None,
+        stagger: bool = False,
+        priorities: dict[str, str] | None = None,
+        freshness: dict[str, int] | None = None,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.periods: dict[str, timedelta] = {}  # planned refresh period per symbol
+        self._due: dict[str, datetime] = {}
+        self._retries: dict[str, tuple[int, datetime]] = {}  # symbol -> (failures, retry time)
+        # Next regular poll while the coordinator wakes up early for retries
+        self._regular_at: datetime | None = None
+        self.configure(interval, calendar, stagger, priorities, freshness)
+
+    def configure(
+        self,
+        interval: timedelta,
+        calendar: MarketCalendar | None = None,
+        stagger: bool = False,
+        priorities: dict[str, str] | None = None,
+        freshness: dict[str, int] | None = None,
+    ) -> None:
+        """Apply new settings, keeping the due times and retries of the symbols."""
+        self.interval = interval
+        self.calendar = calendar  # None polls around the clock
+        self.stagger = stagger
+        self.priorities = priorities or {}
+        self.freshness = freshness or {}  # symbol -> target age of a quote in seconds
+        # Per-symbol due times are kept when staggering or when symbols have their own periods
+        self._per_symbol = stagger or bool(self.priorities or self.freshness)
+        if not self._per_symbol:
+            self._due.clear()
+
+    def forget(self, symbol: str) -> None:
+        """Drop the schedule of a symbol that is no longer tracked."""
+        self.periods.pop(symbol, None)
+        self._due.pop(symbol, None)
+        self._retries.pop(symbol, None)
+
+    def is_due(self, symbol: str, cache: QuoteCache, now: datetime) -> bool:
+        """Return True if the symbol should be fetched now."""
+        quote = None
+        if self.calendar is not None:
+            quote = cache.get(symbol)
+            if not self.calendar.needs_refresh(symbol, quote, cache.fetched_at(symbol), now):
+                return False
+        retry = self._retries.get(symbol)
+        if retry is not None:
+            return retry[1] <= now
+        if (
+            quote is not None
+            and not is_currency_pair(symbol)
+            and not self.calendar.is_open(exchange_for_symbol(symbol), now)
+        ):
+            # The closing quote is fetched as soon as it has settled
+            return True
+        if self._regular_at is not None and now < self._regular_at:
+            # Woken up early, only the symbols waiting for a retry are due
+            return False
+        return self._due.get(symbol, now) <= now
+
+    def mark_fetched(self, symbol: str, now: datetime, fetched_at: datetime | None = None) -> None:
+        """Record a successful fetch of a symbol.
+
+        fetched_at is when the quote was fetched, if it is older than now
+        because it was taken from the cache.
+        """
+        self._retries.pop(symbol, None)
+        if not self._per_symbol:
+            return
+        period = self.periods.get(symbol, self.interval)
+        fetched_at = min(fetched_at or now, now)
+        due = self._due.get(symbol)
+        if due is None:
+            if not self.stagger:
+                self._due[symbol] = fetched_at + period
+            # Otherwise spread() gives the symbol its own slot
+            return
+        # Advance by whole periods, so each symbol keeps its slot and staggered
+        # symbols do not fall into lockstep, but never past the symbol's period
+        # from when the quote was fetched
+        self._due[symbol] = min(
+            due + period * max(math.floor((now - due) / period) + 1, 1), fetched_at + period
+        )
+
+    def reuse_age(self, symbol: str, now: datetime) -> float:
+        """Return how old a cached quote may be, in seconds, to be used instead of fetching.
+
+        Half the scan interval, and at most half the symbol's planned period,
+        so reused quotes still meet its target freshness. A staggered symbol
+        only reuses quotes fetched since its slot, as an older one would
+        pull its next slot forward into that of other symbols.
+        """
+        limit = min(self.interval, self.periods.get(symbol, self.interval)).total_seconds() / 2
+        due = self._due.get(symbol)
+        if self.stagger and due is not None:
+            limit = min(limit, max((now - due).total_seconds(), 0))
+        return limit
+
+    def mark_failed(self, symbol: str, now: datetime) -> datetime:
+        """Record a failed fetch of a symbol and return when to retry it."""
+        failures = self._retries[symbol][0] + 1 if symbol in self._retries else 1
+        delay = MIN_POLL_INTERVAL * 2 ** (failures - 1)
+        delay *= 1 + random.uniform(-RETRY_JITTER, RETRY_JITTER)
+        retry_at = now + max(min(delay, self.interval), MIN_POLL_INTERVAL)
+        self._retries[symbol] = (failures, retry_at)
+        return retry_at
+
+    def weight(self, symbol: str) -> int:
+        """Return the budget weight of a symbol's priority."""
+        return PRIORITY_WEIGHTS[self.priorities.get(symbol, DEFAULT_PRIORITY)]
+
+    def target(self, symbol: str) -> timedelta:
+        """Return the refresh period a symbol asks for."""
+        if symbol in self.freshness:
+            return max(timedelta(seconds=self.freshness[symbol]), MIN_POLL_INTERVAL)
+        return self.interval
+
+    def plan(self, symbols: list[str], rate: float | None) -> None:
+        """Divide a request rate over the symbols and set their refresh periods.
+
+        rate is in requests per second, None means there is no daily limit.
+        Every symbol gets a share of the rate proportional to its priority
+        weight, but never more than its target freshness needs; what it does
+        not need is divided among the others.
+        """
+        targets = {symbol: self.target(symbol).total_seconds() for symbol in symbols}
+        if rate is None:
+            periods = targets
+        else:
+            periods = {}
+            open_weights = {symbol: self.weight(symbol) for symbol in symbols}
+            while open_weights:
+                share = max(rate, 0) / sum(open_weights.values())
+                satisfied = [
+                    symbol
+                    for symbol, weight in open_weights.items()
+                    if share * weight * targets[symbol] >= 1
+                ]
+                if not satisfied:
+                    for symbol, weight in open_weights.items():
+                        periods[symbol] = 1 / (share * weight) if share else math.inf
+                    break
+                for symbol in satisfied:
+                    periods[symbol] = targets[symbol]
+                    rate -= 1 / targets[symbol]
+                    del open_weights[symbol]
+
+        longest = MAX_REFRESH_PERIOD.total_seconds()
+        self.periods = {
+            # Whole minutes, so the plan does not change with every request
+            symbol: timedelta(minutes=math.ceil(min(period, longest) / 60))
+            for symbol, period in periods.items()
+        }
+
+    def spread(self, symbols: list[str], now: datetime) -> None:
+        """Give symbols without a due time evenly spaced slots in the interval."""
+        if not self.stagger:
+            return
+        new = [symbol for symbol in symbols if symbol not in self._due]
+        for index, symbol in enumerate(new, start=1):
+            self._due[symbol] = now + self.interval * index / len(new)
+
+    def as_dict(self) -> dict:
+        """Return the refresh plan for diagnostics."""
+        return {
+            symbol: {
+                "priority": self.priorities.get(symbol, DEFAULT_PRIORITY),
+                "target": self.target(symbol).total_seconds(),
+                "planned": period.total_seconds(),
+            }
+            for symbol, period in self.periods.items()
+        }
+
+    def next_refresh(self, symbols: list[str], cache: QuoteCache, now: datetime) -> timedelta:
+        """Return the delay until the next symbol is due."""
+        next_times = []
+        retry_times = []
+        for symbol in symbols:
+            if symbol in self._retries:
+                retry_times.append(self._retries[symbol][1])
+                continue
+            regular = self._due.get(symbol, now + self.interval)
+            if self.calendar is not None:
+                regular = self.calendar.next_poll(
+                    symbol, cache.get(symbol), cache.fetched_at(symbol), now, regular
+                )
+            next_times.append(regular)
+        regular_at = min(next_times, default=None)
+        retry_at = min(retry_times, default=None)
+        if retry_at is not None and (regular_at is None or retry_at < regular_at):
+            self._regular_at = regular_at
+            return max(retry_at - now, MIN_POLL_INTERVAL)
+        self._regular_at = None
+        if regular_at is None:
+            return self.interval
+        return max(regular_at - now, MIN_POLL_INTERVAL)
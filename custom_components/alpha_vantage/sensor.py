@@ -1,29 +1,65 @@
 """Sensor platform for Alpha Vantage integration."""
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.entity import DeviceInfo
+
+from homeassistant.components.sensor import RestoreSensor, SensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .changes import quote_attributes, quote_value
+from .const import DOMAIN, SENSOR_TYPES, DIAGNOSTIC_SENSOR_TYPES, CONF_SHOW_SENSORS, DEFAULT_SENSORS
+from .market_hours import is_currency_pair
+from .portfolio import PORTFOLIO
 
-from .const import DOMAIN, SENSOR_TYPES, CONF_SHOW_SENSORS, DEFAULT_SENSORS
+def _sensor_keys(coordinator):
+    """Return symbol and sensor type of every sensor the options ask for."""
+    enabled_sensors = coordinator.options.get(CONF_SHOW_SENSORS, DEFAULT_SENSORS)
+    keys = []
+    # Symbol-based sensors
+    for symbol in coordinator.symbols:
+        for sensor_type in enabled_sensors:
+            if sensor_type in SENSOR_TYPES and SENSOR_TYPES[sensor_type]["category"] in ("symbol", "history", "indicators"):
+                keys.append((symbol, sensor_type))
+    # Portfolio totals of the entry, once holdings are configured
+    if coordinator.holdings:
+        for sensor_type in enabled_sensors:
+            if sensor_type in SENSOR_TYPES and SENSOR_TYPES[sensor_type]["category"] == "portfolio":
+                keys.append((PORTFOLIO, sensor_type))
+    return keys
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the Alpha Vantage sensors."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    
-    symbols = coordinator.symbols
-    # Get enabled sensors from options or fallback to default
-    enabled_sensors = entry.options.get(CONF_SHOW_SENSORS, entry.data.get(CONF_SHOW_SENSORS, DEFAULT_SENSORS))
-    
-    entities = []
-    
-    # Add symbol-based sensors
-    for symbol in symbols:
-        for sensor_type in enabled_sensors:
-            if sensor_type in SENSOR_TYPES and SENSOR_TYPES[sensor_type]["category"] == "symbol":
-                entities.append(AlphaVantageSensor(coordinator, symbol, sensor_type))
-    
-    async_add_entities(entities)
+    sensors = {}  # (symbol, sensor type) -> entity
+
+    @callback
+    def async_update_sensors():
+        """Add the sensors the options ask for and remove the ones they dropped."""
+        keys = _sensor_keys(coordinator)
+        registry = er.async_get(hass)
+        for key in set(sensors) - set(keys):
+            entity = sensors.pop(key)
+            if entity.entity_id and registry.async_get(entity.entity_id):
+                registry.async_remove(entity.entity_id)
+            else:
+                hass.async_create_task(entity.async_remove())
+        new = []
+        for symbol, sensor_type in keys:
+            if (symbol, sensor_type) not in sensors:
+                sensors[(symbol, sensor_type)] = AlphaVantageSensor(coordinator, symbol, sensor_type)
+                new.append(sensors[(symbol, sensor_type)])
+        async_add_entities(new)
 
-class AlphaVantageSensor(CoordinatorEntity, SensorEntity):
+    async_update_sensors()
+    entry.async_on_unload(coordinator.async_add_entity_listener(async_update_sensors))
+
+    # Request statistics of the entry, mostly disabled by default
+    async_add_entities(
+        AlphaVantageDiagnosticSensor(coordinator, sensor_type) for sensor_type in DIAGNOSTIC_SENSOR_TYPES
+    )
+
+class AlphaVantageSensor(CoordinatorEntity, RestoreSensor):
     """Representation of an Alpha Vantage sensor."""
 
     def __init__(self, coordinator, symbol, sensor_type):
@@ -32,18 +68,60 @@ class AlphaVantageSensor(CoordinatorEntity, SensorEntity):
         self._symbol = symbol.upper()
         self._sensor_type = sensor_type
         self._sensor_info = SENSOR_TYPES[sensor_type]
+        # Quotes live in coordinator.data["symbols"], other categories under their own key
+        category = self._sensor_info["category"]
+        self._data_key = "symbols" if category == "symbol" else category
         
-        self._attr_name = f"{self._symbol} {self._sensor_info['name']}"
-        self._attr_unique_id = f"{DOMAIN}_{self._symbol}_{sensor_type}"
-        self._attr_translation_key = sensor_type
-            
         self._entry_id = coordinator.config_entry.entry_id
+
+        if category == "portfolio":
+            # One set of portfolio sensors per entry
+            self._attr_name = self._sensor_info["name"]
+            self._attr_unique_id = f"{DOMAIN}_{self._entry_id}_{sensor_type}"
+        else:
+            self._attr_name = f"{self._symbol} {self._sensor_info['name']}"
+            # Scoped to the entry, as several entries can track the same symbol
+            self._attr_unique_id = f"{DOMAIN}_{self._entry_id}_{self._symbol}_{sensor_type}"
+        self._attr_translation_key = sensor_type
         
         # Set attributes from sensor_info
         self._attr_icon = self._sensor_info.get("icon")
         self._attr_device_class = self._sensor_info.get("device_class")
         self._attr_state_class = self._sensor_info.get("state_class")
         self._attr_native_unit_of_measurement = self._sensor_info.get("unit")
+        if coordinator.home_currency and self._sensor_info.get("currency") and not is_currency_pair(self._symbol):
+            self._attr_native_unit_of_measurement = coordinator.home_currency
+        self._written_available = None
+        self._restored_value = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state while the coordinator has no data for the sensor."""
+        await super().async_added_to_hass()
+        if self._quote() is None:
+            last = await self.async_get_last_sensor_data()
+            if last is not None:
+                self._restored_value = last.native_value
+        # The state written when the entity is added counts as the first write
+        self._written_available = self.available
+
+    def _quote(self):
+        """Return the quote, history or indicator stats the sensor shows."""
+        return (self.coordinator.data or {}).get(self._data_key, {}).get(self._symbol)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the value, attributes or availability changed."""
+        available = self.available
+        changes = self.coordinator.changes
+        if (
+            available == self._written_available
+            and self._sensor_type not in self.coordinator.changed_sensors.get(self._symbol, ())
+        ):
+            changes.states_skipped += 1
+            return
+        self._written_available = available
+        changes.states_written += 1
+        super()._handle_coordinator_update()
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -58,38 +136,91 @@ class AlphaVantageSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        data = self.coordinator.data.get('symbols', {}).get(self._symbol)
-        
-        if data:
-            value = data
-            for key in self._sensor_info["json_path"]:
-                if isinstance(value, dict):
-                    value = value.get(key)
-                else:
-                    return None
-                    
-                if value is None:
-                    return None
-            
-            # Formatting
-            if isinstance(value, str) and value.endswith('%'):
-                value = value.replace('%', '')
-                
-            try:
-                num_value = float(value)
-                return round(num_value, self.coordinator.decimals)
-            except (ValueError, TypeError):
-                return value
-            
-        return None
+        quote = self._quote()
+        if quote:
+            # Portfolio totals are already in the home currency
+            rate = 1.0 if self._data_key == "portfolio" else self.coordinator.rate_for(self._symbol)
+            return quote_value(quote, self._sensor_info["attribute"], self.coordinator.decimals, rate)
+        # Shown until the first refresh after a restart
+        return self._restored_value
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        data = self.coordinator.data.get('symbols', {}).get(self._symbol)
-        if data:
-            return {
-                "last_refreshed": data.get('07. latest trading day'),
-                "symbol": self._symbol,
-            }
+        quote = self._quote()
+        if not quote:
+            return None
+        attributes = quote_attributes(quote, self._symbol)
+        if self._data_key == "symbols" and self._symbol in self.coordinator.stale:
+            # Last good quote shown while the refresh is retried
+            attributes["stale"] = True
+            # Absolute, so it stays right while failed retries write no new state
+            attributes["quote_fetched_at"] = dt_util.utc_from_timestamp(
+                self.coordinator.stale[self._symbol]
+            ).isoformat()
+        return attributes
+
+
+class AlphaVantageDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Timing and quota statistics of the requests made for a config entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, sensor_type):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._sensor_type = sensor_type
+        sensor_info = DIAGNOSTIC_SENSOR_TYPES[sensor_type]
+        self._entry_id = coordinator.config_entry.entry_id
+
+        self._attr_name = f"Alpha Vantage {sensor_info['name']}"
+        self._attr_unique_id = f"{DOMAIN}_{self._entry_id}_{sensor_type}"
+        self._attr_translation_key = sensor_type
+        self._attr_icon = sensor_info.get("icon")
+        self._attr_state_class = sensor_info.get("state_class")
+        self._attr_native_unit_of_measurement = sensor_info.get("unit")
+        self._attr_entity_registry_enabled_default = sensor_info.get("enabled", False)
+        self._written = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the value or attributes changed."""
+        written = (self.available, self.native_value, self.extra_state_attributes)
+        if written == self._written:
+            return
+        self._written = written
+        super()._handle_coordinator_update()
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device information about this entity."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._entry_id)},
+            name="Alpha Vantage",
+            manufacturer="Alpha Vantage",
+            entry_type="service",
+        )
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        value = self.coordinator.diagnostic_values()[self._sensor_type]
+        if isinstance(value, float):
+            return round(value, 2)
+        return value
+
+    @property
+    def extra_state_attributes(self):
+        """Return the latency histograms and failure categories."""
+        metrics = self.coordinator.pool.metrics
+        if self._sensor_type == "request_latency":
+            return {function: histogram.as_dict() for function, histogram in metrics.latency.items()}
+        if self._sensor_type == "request_failures":
+            return dict(metrics.failures)
+        if self._sensor_type == "planned_freshness":
+            # Refresh period each symbol gets under the current quota
+            return self.coordinator.scheduler.as_dict()
+        if self._sensor_type == "request_breaker":
+            # One breaker per API key of the entry
+            return {hub.budget.key_id: hub.breaker.as_dict() for hub in self.coordinator.pool.hubs}
         return None
@@ -0,0 +1,50 @@
+"""Persisted state shared by the Alpha Vantage config entries."""
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_VERSION
+
+
+class SharedStore(ABC):
+    """State kept once in hass.data[DOMAIN] and persisted with a Store.
+
+    Subclasses set STORAGE_KEY and DATA_KEY and restore their state from the
+    stored data in _restore.
+    """
+
+    STORAGE_KEY: str
+    DATA_KEY: str
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, self.STORAGE_KEY)
+        self._load_task: asyncio.Task | None = None
+
+    async def async_load(self) -> None:
+        """Load the stored data once, even if called concurrently."""
+        if self._load_task is None:
+            self._load_task = self._hass.async_create_task(self._async_load())
+        await self._load_task
+
+    async def _async_load(self) -> None:
+        self._restore(await self._store.async_load() or {})
+
+    @abstractmethod
+    def _restore(self, stored: dict) -> None:
+        """Restore the state from the stored data."""
+
+    @classmethod
+    async def async_get(cls, hass: HomeAssistant):
+        """Return the loaded instance shared by all config entries."""
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        instance = domain_data.get(cls.DATA_KEY)
+        if instance is None:
+            instance = domain_data[cls.DATA_KEY] = cls(hass)
+        await instance.async_load()
+        return instance
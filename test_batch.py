@@ -3,9 +3,9 @@ import json
 import sys
 
 def test_batch_api(api_key, symbols="AAPL,MSFT,TSLA"):
-    url = f"https://www.alphavantage.co/query?function=BATCH_STOCK_QUOTES&symbols={symbols}&apikey={api_key}"
+    url = f"https://www.alphavantage.co/query?function=REALTIME_BULK_QUOTES&symbol={symbols}&apikey={api_key}"
     
-    print(f"Testing Alpha Vantage BATCH_STOCK_QUOTES for symbols: {symbols}...")
+    print(f"Testing Alpha Vantage REALTIME_BULK_QUOTES for symbols: {symbols}...")
     try:
         with urllib.request.urlopen(url) as response:
             if response.status == 200: